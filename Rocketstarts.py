@@ -1,245 +1,270 @@
 import streamlit as st
-import requests
+import streamlit.components.v1 as components
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import pytz
-from geopy.distance import geodesic
+import requests
 import folium
-from streamlit_folium import folium_static
-import math
-import numpy as np
-from folium.plugins import AntPath
+from folium.plugins import AntPath, HeatMap
+from rocket_visibility import (
+    calculate_ground_track,
+    calculate_rocket_visibility,
+    compute_grid_visibility,
+    germany_coords,
+    observer_grid,
+    observer_regions,
+    orbit_params,
+    orbit_period_for_type,
+    split_ground_track,
+    OrbitWindowCache
+)
+from launch_store import LaunchStore
+from prefetch_worker import PrefetchWorker
+from rocket_launches import (
+    build_launch_table,
+    build_orbit_table,
+    filter_launches,
+    launch_details,
+    parse_launch,
+    process_launches_parallel,
+    summarize_launches
+)
 
 # Seitentitel und Beschreibung
 st.title("Raketenstarts - Weltweit")
 st.markdown("Diese App zeigt kommende Raketenstarts mit UTC und deutscher Zeit sowie Sichtbarkeit während Umrundungen.")
 
+# Anzahl der abzurufenden Starts (wird seitenweise von der API geladen)
+LAUNCH_LIMIT = 100
+
+# Standardeinstellungen der Schieberegler (werden im Hintergrund vorberechnet)
+DEFAULT_ORBIT_COUNT = 20
+DEFAULT_VISIBILITY_DAYS = 3
+
+# Persistenter Launch-Cache, gemeinsam für alle Sitzungen
+@st.cache_resource
+def get_launch_store():
+    return LaunchStore(max_launches=LAUNCH_LIMIT, max_age=3600)
+
+# Hintergrund-Worker: erneuert die Startdaten vor Ablauf und berechnet die Standardeinstellungen vor
+@st.cache_resource
+def get_prefetch_worker():
+    return PrefetchWorker(
+        get_launch_store(),
+        total_orbits=DEFAULT_ORBIT_COUNT,
+        visibility_days=DEFAULT_VISIBILITY_DAYS,
+        orbit_cache=get_orbit_window_cache()
+    ).start()
+
 # Funktion zum Abrufen von Daten über bevorstehende Raketenstarts
-@st.cache_data(ttl=3600)  # Cache der Daten für 1 Stunde
 def get_launch_data():
-    url = "https://ll.thespacedevs.com/2.2.0/launch/upcoming/?limit=20&mode=detailed"
-    headers = {"Accept": "application/json"}
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            return response.json()
+    store = get_launch_store()
+    worker = get_prefetch_worker()
+    data = store.current()
+    if data is None and worker.is_alive():
+        # Nur beim allerersten Aufruf ohne Snapshot auf den Worker warten
+        worker.wait(timeout=store.timeout * 2)
+        data = store.current()
+    elif data is None:
+        data = store.get()
+    if store.last_error:
+        if data:
+            fetched_at = datetime.fromtimestamp(store.fetched_at, pytz.utc).astimezone(pytz.timezone("Europe/Berlin"))
+            st.warning(f"{store.last_error} - zeige gespeicherte Daten vom {fetched_at.strftime('%d.%m.%Y, %H:%M')} Uhr.")
         else:
-            st.error(f"Fehler beim Abrufen der Daten: {response.status_code}")
-            return None
-    except requests.exceptions.RequestException as e:
-        st.error(f"Verbindungsfehler: {str(e)}")
-        return None
+            st.error(store.last_error)
+    return data
 
-# Verbesserte Funktion zur Berechnung der Orbit-Umlaufzeit
-def calculate_orbit_period(orbit_height):
-    """
-    Berechnet die Umlaufzeit eines Orbits basierend auf der Höhe
-    """
-    earth_radius = 6371  # km
-    gravitational_parameter = 3.986004418e14  # m³/s² (GM für die Erde)
-    orbit_radius = (earth_radius + orbit_height) * 1000  # m
-    
-    # Kepler's Third Law: T² = (4π²/GM) * r³
-    orbit_period_seconds = 2 * math.pi * math.sqrt(orbit_radius**3 / gravitational_parameter)
-    return orbit_period_seconds / 60  # Minuten
+# Cache der berechneten Sichtungszeitfenster, bleibt über Reruns und Sitzungen erhalten
+@st.cache_resource
+def get_orbit_window_cache():
+    return OrbitWindowCache(max_entries=500)
 
-# Funktion zur Berechnung der Orbit-Punkte für die Visualisierung
-def calculate_orbit_path(launch_site_coords, inclination=51.6):
-    """
-    Erstellt einen vereinfachten Orbit-Pfad für die Visualisierung
-    """
-    # Erdradius in km
-    earth_radius = 6371
-    
-    # Angenommene Orbithöhe (typisch für LEO)
-    orbit_height = 300  # km
-    
-    # Umrechnung in Radians
-    lat1_rad = math.radians(launch_site_coords[0])
-    lon1_rad = math.radians(launch_site_coords[1])
-    
-    # Orbit-Punkte berechnen (vereinfacht)
-    orbit_points = []
-    
-    # Kreis um die Erde mit Neigungswinkel (Inclination)
-    for angle in range(0, 360, 5):  # 5-Grad-Schritte für flüssigere Kurve
-        # Umrechnung von Winkel zu Position auf geneigter Umlaufbahn
-        angle_rad = math.radians(angle)
-        
-        # Einfaches Modell für geneigte Umlaufbahn
-        # (Dies ist eine Vereinfachung, tatsächliche Orbits sind komplexer)
-        lat_rad = math.asin(math.sin(lat1_rad) * math.cos(math.radians(inclination)) + 
-                           math.cos(lat1_rad) * math.sin(math.radians(inclination)) * math.sin(angle_rad))
-        
-        lon_diff = math.atan2(math.sin(angle_rad) * math.cos(math.radians(inclination)),
-                             math.cos(angle_rad) - math.sin(lat1_rad) * math.sin(lat_rad))
-        
-        lon_rad = ((lon1_rad + lon_diff + math.pi) % (2 * math.pi)) - math.pi
-        
-        lat = math.degrees(lat_rad)
-        lon = math.degrees(lon_rad)
-        
-        orbit_points.append((lat, lon))
-    
-    return orbit_points
+# Prozess-Pool für die parallele Berechnung (einmal pro Server-Prozess)
+@st.cache_resource
+def get_process_pool():
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+
+# Sichtbarkeit eines Starts für ein ganzes Gitter von Beobachtungsorten
+@st.cache_data(show_spinner=False, max_entries=50)
+def get_visibility_grid(launch_site_coords, launch_time_utc, mission_type, region, total_orbits, visibility_days):
+    observer_lat, observer_lon = observer_grid(observer_regions[region]["bounds"], observer_regions[region]["step"])
+    return compute_grid_visibility(
+        (launch_site_coords, launch_time_utc, mission_type),
+        observer_lat,
+        observer_lon,
+        total_orbits=total_orbits,
+        visibility_days=visibility_days
+    )
 
-# Deutschland-Koordinaten (ungefährer Mittelpunkt)
-germany_coords = (51.1657, 10.4515)
+# Koordinaten für eine Ortseingabe ("Breite, Länge" oder Ortsname über OSM Nominatim).
+# Netzwerkfehler werden weitergereicht statt None zu liefern: st.cache_data speichert
+# Ausnahmen nicht, so wird nur ein echtes "nicht gefunden" für 24 Stunden gemerkt.
+@st.cache_data(show_spinner=False, ttl=86400)
+def geocode_location(query):
+    try:
+        lat, lon = (float(part) for part in query.split(","))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return (lat, lon)
+    except ValueError:
+        pass
+
+    response = requests.get(
+        "https://nominatim.openstreetmap.org/search",
+        params={"q": query, "format": "json", "limit": 1},
+        headers={"User-Agent": "RocketstartsApp/1.0"},
+        timeout=10
+    )
+    response.raise_for_status()
+    data = response.json()
+    if not data:
+        return None
+    return (float(data[0]["lat"]), float(data[0]["lon"]))
 
-# Verbesserte Funktion zur präzisen Berechnung der Sichtbarkeitszeiten und Umrundungen
-def calculate_rocket_visibility(
-    launch_site_coords, 
-    launch_time_utc, 
-    mission_type="LEO",
-    total_orbits=20,
-    visibility_days=3
+# Karte eines Starts als HTML, zwischengespeichert pro Start und Orbit-Einstellungen
+# (der Start selbst wird nicht gehasht, Schlüssel sind ID, Startzeit und Einstellungen)
+@st.cache_data(show_spinner=False, max_entries=100)
+def render_launch_map(
+    launch_id,
+    launch_time_utc,
+    orbit_count,
+    visibility_days,
+    track_revolutions,
+    track_resolution,
+    heatmap_region,
+    _launch
 ):
-    """
-    Berechnet wann eine Rakete nach dem Start von Deutschland aus sichtbar sein könnte,
-    unter Berücksichtigung der Erdrotation und des orbitalen Mechanismus.
-    """
-    # Verschiedene Orbithöhen basierend auf Missionstyp
-    orbit_params = {
-        "LEO": {"height": 300, "inclination": 51.6},  # Typisch für ISS
-        "MEO": {"height": 20000, "inclination": 55},  # Medium Earth Orbit
-        "GEO": {"height": 35786, "inclination": 0},   # Geostationärer Orbit
-        "SSO": {"height": 600, "inclination": 97.8}   # Sonnensynchroner Orbit
-    }
+    # Bodenspur mit der Inklination des erkannten Orbit-Typs (zwischengespeichert)
+    ground_track = calculate_ground_track(
+        _launch["coordinates"],
+        inclination=orbit_params[_launch["orbit_type"]]["inclination"],
+        revolutions=track_revolutions,
+        resolution=track_resolution,
+        orbit_period_minutes=orbit_period_for_type(_launch["orbit_type"]) if track_revolutions > 1 else None
+    )
     
-    # Standardmäßig LEO verwenden, aber versuchen, den Missionstyp zu erkennen
-    orbit_type = "LEO"
-    if mission_type and isinstance(mission_type, str):
-        mission_lower = mission_type.lower()
-        if "geo" in mission_lower:
-            orbit_type = "GEO"
-        elif "meo" in mission_lower:
-            orbit_type = "MEO"
-        elif ("sun" in mission_lower and "syn" in mission_lower) or "sso" in mission_lower:
-            orbit_type = "SSO"
+    m = folium.Map(location=_launch["coordinates"], zoom_start=3)
     
-    # Orbitalparameter auswählen
-    orbit_height = orbit_params[orbit_type]["height"]
-    inclination = orbit_params[orbit_type]["inclination"]
+    # Startort markieren
+    folium.Marker(
+        location=_launch["coordinates"],
+        popup=f"{_launch['name']}<br>{_launch['location']}",
+        icon=folium.Icon(icon="rocket", prefix="fa", color="red")
+    ).add_to(m)
     
-    # Berechnen der Umlaufzeit in Minuten basierend auf Kepler'schen Gesetzen
-    orbit_period_minutes = calculate_orbit_period(orbit_height)
+    # Deutschland markieren
+    folium.Marker(
+        location=germany_coords,
+        popup="Deutschland",
+        icon=folium.Icon(icon="home", prefix="fa", color="blue")
+    ).add_to(m)
     
-    # Bei geostationärem Orbit ist die Periode immer ca. 24 Stunden
-    if orbit_type == "GEO":
-        orbit_period_minutes = 24 * 60
+    if heatmap_region:
+        visibility_grid = get_visibility_grid(
+            _launch["coordinates"],
+            launch_time_utc,
+            _launch["mission_description"] or _launch["mission_type"],
+            heatmap_region,
+            orbit_count,
+            visibility_days
+        )
+        heat_points = visibility_grid[visibility_grid["best_visibility"] > 0]
+        HeatMap(
+            list(zip(
+                heat_points["latitude"].tolist(),
+                heat_points["longitude"].tolist(),
+                (heat_points["best_visibility"] / 100).tolist()
+            )),
+            name="Sichtbarkeit",
+            min_opacity=0.3,
+            radius=12 if heatmap_region == "Deutschland" else 20,
+            blur=15
+        ).add_to(m)
     
-    # Berechnung der Erdrotation pro Orbit (Grad)
-    earth_rotation_per_orbit = (orbit_period_minutes / (24 * 60)) * 360
+    # Orbit-Pfad zeichnen (an der Datumsgrenze aufgeteilt)
+    folium.PolyLine(
+        locations=split_ground_track(ground_track),
+        color="orange",
+        weight=2,
+        opacity=0.7
+    ).add_to(m)
     
-    # Berechnung der Entfernung zwischen Startort und Deutschland
-    distance_km = geodesic(launch_site_coords, germany_coords).kilometers
+    # Sichtbarkeitspunkte für die ersten Umrundungen visualisieren
+    visible_orbits = [o for o in _launch["orbit_visibility"] if o.get("visibility_chance", 0) > 30]
     
-    # Beobachterfaktor je nach Inklination
-    # (Deutschland liegt bei ~51°N, daher sind Inklinationen nahe 51° besser sichtbar)
-    inclination_factor = 1.0 - min(1.0, abs(51.0 - inclination) / 90.0)
+    # Die Farbe basierend auf der Sichtbarkeit wählen
+    def get_visibility_color(chance):
+        if chance > 70:
+            return "green"
+        elif chance > 40:
+            return "orange"
+        elif chance > 20:
+            return "yellow"
+        else:
+            return "red"
     
-    # Zeitgrenze für die Berechnung
-    end_time = launch_time_utc + timedelta(days=visibility_days)
+    # Füge Sichtbarkeitspunkte zur Karte hinzu
+    for orbit in visible_orbits[:10]:  # Begrenzen auf die ersten 10 für Übersichtlichkeit
+        if "coords" in orbit:
+            folium.CircleMarker(
+                location=orbit["coords"],
+                radius=5,
+                popup=f"Umrundung {orbit['orbit_number']}<br>Sichtbarkeit: {orbit['visibility_chance']}%<br>Zeit (DE): {orbit['time_de']}",
+                color=get_visibility_color(orbit["visibility_chance"]),
+                fill=True,
+                fill_opacity=0.8
+            ).add_to(m)
     
-    # Mögliche Sichtungszeitfenster
-    visibility_windows = []
+    # Zeichne die Verbindung zwischen Deutschland und den sichtbaren Orbits
+    for orbit in visible_orbits[:5]:  # Nur die ersten 5 für Übersichtlichkeit
+        if "coords" in orbit and orbit.get("visibility_chance", 0) > 40:
+            # AntPath für die Animation
+            AntPath(
+                locations=[germany_coords, orbit["coords"]],
+                color=get_visibility_color(orbit["visibility_chance"]),
+                weight=2,
+                opacity=0.7,
+                dash_array=[10, 20],
+                pulse_color=get_visibility_color(orbit["visibility_chance"]),
+                delay=800
+            ).add_to(m)
     
-    # Zeit des aktuellen Orbits
-    current_orbit_time = launch_time_utc
-    orbit_number = 0
+    # Wie folium_static: Karte in eine Figure einbetten und als HTML rendern
+    return folium.Figure().add_child(m).render()
+
+# Balkendiagramm-Daten und Tabellen pro Datum, zwischengespeichert pro Start und Orbit-Einstellungen
+@st.cache_data(show_spinner=False, max_entries=100)
+def build_visibility_tables(launch_id, launch_time_utc, orbit_count, visibility_days, _orbits):
+    # Balkendiagramm mit Sichtbarkeitsprozent
+    vis_df = pd.DataFrame([
+        {
+            "Umrundung": orbit["orbit_number"],
+            "Zeit": orbit["time_de"].split(" ")[1],  # Nur die Uhrzeit
+            "Datum": orbit["visibility_date"],
+            "Sichtbarkeit (%)": orbit["visibility_chance"]
+        } for orbit in _orbits
+    ])
     
-    # Orbits durchgehen bis zur maximalen Anzahl oder Zeitgrenze
-    while orbit_number < total_orbits and current_orbit_time < end_time:
-        orbit_number += 1
-        
-        # Zeit der aktuellen Umrundung berechnen
-        current_orbit_time = launch_time_utc + timedelta(minutes=orbit_period_minutes * orbit_number)
-        
-        # Berechnung der Längengrad-Verschiebung durch Erdrotation
-        longitude_shift = (orbit_number * earth_rotation_per_orbit) % 360
-        
-        # Position entlang der Umlaufbahn zum aktuellen Zeitpunkt
-        orbit_position_rad = 2 * math.pi * (orbit_number % 1)
-        
-        # Berechnen des Breitengrades der aktuellen Position
-        latitude = math.degrees(math.asin(math.sin(math.radians(inclination)) * 
-                                         math.sin(orbit_position_rad)))
-        
-        # Berechnen des umgerechneten Längengrades (berücksichtigt Erdrotation)
-        longitude = (launch_site_coords[1] + longitude_shift) % 360
-        if longitude > 180:
-            longitude -= 360
-            
-        # Aktuelle Satellitenposition
-        current_position = (latitude, longitude)
-        
-        # Entfernung zur aktuellen Position
-        current_distance = geodesic(germany_coords, current_position).kilometers
-        
-        # Sichtbarkeitsfaktor basierend auf der Entfernung
-        # Je näher, desto besser sichtbar (max. Sichtweite ca. 2000km bei dieser Orbithöhe)
-        max_visibility_distance = 2000  # km
-        distance_factor = max(0, 1 - (current_distance / max_visibility_distance))
-        
-        # Zeit in Deutschland
-        de_timezone = pytz.timezone('Europe/Berlin')
-        orbit_time_de = current_orbit_time.replace(tzinfo=pytz.UTC).astimezone(de_timezone)
-        
-        # Tageszeit-Faktor (Nachts besser sichtbar)
-        hour = orbit_time_de.hour
-        if 22 <= hour or hour <= 4:
-            time_factor = 1.0  # Optimale Nacht
-            visibility_text = "Sehr gut (dunkler Nachthimmel)"
-        elif (20 <= hour < 22) or (4 < hour <= 6):
-            time_factor = 0.8  # Dämmerung
-            visibility_text = "Gut (Dämmerung)"
-        elif (18 <= hour < 20) or (6 < hour <= 8):
-            time_factor = 0.4  # Morgen/Abend
-            visibility_text = "Mäßig (Heller Himmel)"
-        else:
-            time_factor = 0.1  # Tag
-            visibility_text = "Schlecht (Tageslicht)"
-            
-        # Gesamte Sichtbarkeitswahrscheinlichkeit (0-100%)
-        visibility_chance = min(100, int(
-            (distance_factor * 0.5 + inclination_factor * 0.3 + time_factor * 0.2) * 100
-        ))
-        
-        # Orbit-Typ spezifische Anpassungen
-        if orbit_type == "GEO":
-            visibility_chance = int(visibility_chance * 0.7)  # GEO ist schwieriger zu sehen
-            visibility_note = f"Geostationärer Orbit - Position bleibt fest am Himmel"
-        elif orbit_type == "SSO":
-            visibility_note = f"Sonnensynchroner Orbit - Fliegt meist morgens/abends über"
-        else:
-            visibility_note = f"{orbit_type}-Orbit" + (f" - Sichtbarkeit {visibility_chance}%" if visibility_chance > 0 else " - Wahrscheinlich nicht sichtbar")
-        
-        # Zeitfenster für die Sichtbarkeit (typischerweise 5-10 Minuten)
-        visibility_duration = int(5 + (visibility_chance / 100) * 5)  # Minuten
-        
-        # Zeitfenster berechnen
-        window_start = orbit_time_de - timedelta(minutes=visibility_duration/2)
-        window_end = orbit_time_de + timedelta(minutes=visibility_duration/2)
-        
-        # Informationen zum Orbit sammeln
-        orbit_info = {
-            "orbit_number": orbit_number,
-            "time_utc": current_orbit_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "time_de": orbit_time_de.strftime("%Y-%m-%d %H:%M:%S"),
-            "visibility_chance": visibility_chance,
-            "visibility_text": visibility_text,
-            "window_start": window_start.strftime("%H:%M:%S"),
-            "window_end": window_end.strftime("%H:%M:%S"),
-            "visibility_date": orbit_time_de.strftime("%Y-%m-%d"),
-            "duration_minutes": visibility_duration,
-            "orbit_type": orbit_type,
-            "hinweis": visibility_note,
-            "coords": current_position
-        }
-        
-        visibility_windows.append(orbit_info)
+    # Nach Datum gruppieren
+    visibility_by_date = {}
+    for orbit in _orbits:
+        visibility_by_date.setdefault(orbit["visibility_date"], []).append(orbit)
     
-    return visibility_windows
+    tables_by_date = {
+        date: pd.DataFrame([
+            {
+                "Umrundung": o["orbit_number"],
+                "Uhrzeit (DE)": o["time_de"].split(" ")[1],
+                "Sichtbarkeitsfenster": f"{o['window_start']} - {o['window_end']}",
+                "Sichtbarkeit (%)": o["visibility_chance"],
+                "Qualität": o["visibility_text"]
+            } for o in orbits
+        ])
+        for date, orbits in visibility_by_date.items()
+    }
+    return vis_df, tables_by_date
 
 # Hauptfunktion der App
 def main():
@@ -247,12 +272,6 @@ def main():
     with st.spinner("Rufe aktuelle Raketenstartdaten ab..."):
         launch_data = get_launch_data()
 
-    # Vereinfachte Zeitzonen-Liste
-    timezones = {
-        "Deutschland": "Europe/Berlin",
-        "UTC": "UTC"
-    }
-
     # Fortschrittsbalken für die Berechnungen
     progress_bar = None
 
@@ -270,147 +289,107 @@ def main():
         visibility_filter = st.sidebar.checkbox("Nur mit potenzieller Sichtbarkeit in Deutschland", value=False)
         
         # Anzahl der zu berechnenden Umrundungen
-        orbit_count = st.sidebar.slider("Anzahl der Umrundungen für Berechnung", 5, 50, 20)
+        orbit_count = st.sidebar.slider("Anzahl der Umrundungen für Berechnung", 5, 50, DEFAULT_ORBIT_COUNT)
         
         # Anzahl der Tage für die Sichtbarkeitsberechnung
-        visibility_days = st.sidebar.slider("Berechnungszeitraum (Tage)", 1, 7, 3)
+        visibility_days = st.sidebar.slider("Berechnungszeitraum (Tage)", 1, 7, DEFAULT_VISIBILITY_DAYS)
         
-        # Daten vorbereiten
-        launches = []
+        # Optionale parallele Berechnung für große Startlisten
+        parallel_mode = st.sidebar.checkbox(
+            "Parallele Berechnung (mehrere Prozesse)",
+            value=False,
+            help="Verteilt die Starts auf mehrere Prozesse. Lohnt sich vor allem bei sehr vielen Starts."
+        )
         
         # Fortschrittsbalken für die Datenverarbeitung
         progress_bar = st.progress(0)
         
-        for idx, launch in enumerate(launch_data["results"]):
-            # Aktualisiere Fortschrittsbalken
-            progress = (idx + 1) / len(launch_data["results"])
-            progress_bar.progress(progress)
-            
-            # Grundlegende Informationen extrahieren
-            name = launch.get("name", "Unbekannt")
-            rocket_name = launch.get("rocket", {}).get("configuration", {}).get("name", "Unbekannte Rakete")
-            launch_service_provider = launch.get("launch_service_provider", {}).get("name", "Unbekannter Anbieter")
-            mission_type = launch.get("mission", {}).get("type", "Unbekannter Missionstyp")
-            
-            # Mission-Beschreibung für bessere Orbit-Klassifizierung
-            mission_description = launch.get("mission", {}).get("description", "")
+        # Vom Hintergrund-Worker vorberechneter Stand (nur für die Standardeinstellungen)
+        precomputed = get_prefetch_worker().result(orbit_count, visibility_days)
+        
+        if precomputed is not None:
+            # Die Tabellen werden von allen Sitzungen geteilt und nur gelesen
+            launch_table = precomputed.launch_table
+            orbit_table = precomputed.orbit_table
+            warnings = list(precomputed.warnings)
+        elif parallel_mode:
+            launch_table, orbit_table, warnings = process_launches_parallel(
+                launch_data["results"],
+                get_process_pool(),
+                total_orbits=orbit_count,
+                visibility_days=visibility_days,
+                progress_callback=progress_bar.progress
+            )
+        else:
+            # Daten vorbereiten
+            launches = []
+            warnings = []
             
-            # Startzeit und -ort
-            launch_time_str = launch.get("net", None)
-            if not launch_time_str:
-                continue
-                
-            try:
-                launch_time_utc = datetime.fromisoformat(launch_time_str.replace("Z", "+00:00"))
-            except ValueError:
-                continue
+            for idx, launch in enumerate(launch_data["results"]):
+                # Aktualisiere Fortschrittsbalken
+                progress = (idx + 1) / len(launch_data["results"])
+                progress_bar.progress(progress)
                 
-            pad_name = launch.get("pad", {}).get("name", "Unbekannter Startplatz")
-            location_name = launch.get("pad", {}).get("location", {}).get("name", "Unbekannter Ort")
-            country_code = launch.get("pad", {}).get("location", {}).get("country_code", "??")
+                launch_entry, warning = parse_launch(launch)
+                if warning:
+                    warnings.append(warning)
+                if launch_entry is not None:
+                    launches.append(launch_entry)
             
-            # Koordinaten des Startorts
-            latitude = launch.get("pad", {}).get("latitude")
-            longitude = launch.get("pad", {}).get("longitude")
+            # Starts als Tabelle (nach Startzeit sortiert)
+            launch_table = build_launch_table(launches)
             
-            # Startzeiten in den vereinfachten Zeitzonen
-            launch_times = {}
-            for tz_name, tz_code in timezones.items():
-                timezone = pytz.timezone(tz_code)
-                local_time = launch_time_utc.astimezone(timezone)
-                launch_times[tz_name] = local_time.strftime("%d.%m.%Y, %H:%M:%S")
-            
-            # Orbit-Typ aus Missionsbeschreibung erkennen
-            orbit_type = "LEO"  # Standard: Low Earth Orbit
-            if mission_description:
-                if "geostationär" in mission_description.lower() or "geostationary" in mission_description.lower() or "geo" in mission_description.lower():
-                    orbit_type = "GEO"
-                elif "sonnensynchron" in mission_description.lower() or "sun-synchronous" in mission_description.lower() or "sso" in mission_description.lower():
-                    orbit_type = "SSO"
-                elif "medium earth" in mission_description.lower() or "meo" in mission_description.lower():
-                    orbit_type = "MEO"
-            
-            # Umrundungen und Sichtbarkeit berechnen (falls Koordinaten vorhanden sind)
-            if latitude is not None and longitude is not None:
-                try:
-                    launch_site_coords = (float(latitude), float(longitude))
-                    orbit_visibility = calculate_rocket_visibility(
-                        launch_site_coords, 
-                        launch_time_utc, 
-                        mission_description or mission_type,
-                        total_orbits=orbit_count,
-                        visibility_days=visibility_days
-                    )
-                    orbit_path = calculate_orbit_path(launch_site_coords)
-                except Exception as e:
-                    st.warning(f"Fehler bei der Berechnung für {name}: {str(e)}")
-                    orbit_visibility = []
-                    orbit_path = []
-                    launch_site_coords = None
-            else:
-                orbit_visibility = []
-                orbit_path = []
-                launch_site_coords = None
-                
-            # Daten für die Liste hinzufügen
-            launches.append({
-                "name": name,
-                "rocket": rocket_name,
-                "provider": launch_service_provider,
-                "mission_type": mission_type,
-                "mission_description": mission_description,
-                "pad": pad_name,
-                "location": f"{location_name}, {country_code}",
-                "coordinates": launch_site_coords,
-                "times": launch_times,
-                "orbit_type": orbit_type,
-                "orbit_visibility": orbit_visibility,
-                "orbit_path": orbit_path,
-                "utc_time": launch_time_utc  # Für Sortierung
-            })
+            # Umrundungen und Sichtbarkeit für alle Starts mit Koordinaten in einem Durchgang berechnen
+            # (bereits berechnete Umrundungen kommen aus dem Cache, nur fehlende werden ergänzt)
+            orbit_table, orbit_warnings = build_orbit_table(
+                launch_table,
+                total_orbits=orbit_count,
+                visibility_days=visibility_days,
+                cache=get_orbit_window_cache()
+            )
+            warnings.extend(orbit_warnings)
+        
+        for warning in warnings:
+            st.warning(warning)
         
         # Fortschrittsbalken entfernen
         if progress_bar:
             progress_bar.empty()
         
-        # Nach Startzeit sortieren
-        launches = sorted(launches, key=lambda x: x["utc_time"])
-        
-        # Zeitfilter anwenden
-        now = datetime.now(pytz.utc)
-        filtered_launches = launches.copy()
-        
-        if time_range == "Nächste 24 Stunden":
-            filtered_launches = [l for l in filtered_launches if l["utc_time"] <= now + timedelta(hours=24)]
-        elif time_range == "Nächste 7 Tage":
-            filtered_launches = [l for l in filtered_launches if l["utc_time"] <= now + timedelta(days=7)]
-        elif time_range == "Nächsten 30 Tage":
-            filtered_launches = [l for l in filtered_launches if l["utc_time"] <= now + timedelta(days=30)]
-        
-        # Sichtbarkeitsfilter anwenden
-        if visibility_filter:
-            filtered_launches = [
-                l for l in filtered_launches 
-                if any(orb.get("visibility_chance", 0) > 30 for orb in l["orbit_visibility"])
-            ]
+        # Zeit- und Sichtbarkeitsfilter anwenden
+        filtered_launches = filter_launches(
+            launch_table,
+            orbit_table,
+            time_range=time_range,
+            visibility_filter=visibility_filter,
+            now=datetime.now(pytz.utc)
+        )
         
         # Wähle einen bestimmten Start aus für Details
-        if filtered_launches:
+        if not filtered_launches.empty:
             st.header("Raketeninformationen")
-            launch_names = [f"{launch['name']} - {launch['times']['Deutschland']} - {launch['orbit_type']}" for launch in filtered_launches]
+            launch_names = (
+                filtered_launches["name"] + " - " + filtered_launches["start_de"] + " - " + filtered_launches["orbit_type"]
+            ).tolist()
             selected_launch_index = st.selectbox("Wähle einen Raketenstart aus:", 
                                                 range(len(launch_names)),
                                                 format_func=lambda i: launch_names[i])
             
-            selected_launch = filtered_launches[selected_launch_index]
+            selected_launch = launch_details(launch_table, orbit_table, filtered_launches.index[selected_launch_index])
             
             # Detailansicht
             st.header(selected_launch["name"])
             
-            # Tabbed Interface für verschiedene Ansichten
-            tab1, tab2, tab3 = st.tabs(["🚀 Startdetails", "🌎 Umlaufbahn & Sichtbarkeit", "🗺️ Karte"])
+            # Ansichtsauswahl statt st.tabs: nur die gewählte Ansicht wird berechnet und gerendert
+            view = st.radio(
+                "Ansicht",
+                ["🚀 Startdetails", "🌎 Umlaufbahn & Sichtbarkeit", "🗺️ Karte"],
+                horizontal=True,
+                label_visibility="collapsed",
+                key="view"
+            )
             
-            with tab1:
+            if view == "🚀 Startdetails":
                 st.subheader("Startdetails")
                 col1, col2 = st.columns(2)
                 
@@ -430,31 +409,18 @@ def main():
                     st.subheader("Missionsbeschreibung")
                     st.markdown(selected_launch['mission_description'])
             
-            with tab2:
+            elif view == "🌎 Umlaufbahn & Sichtbarkeit":
                 st.subheader("Umrundungen und Sichtbarkeit in Deutschland")
                 
                 # Graf für Sichtbarkeit
                 if selected_launch["orbit_visibility"]:
-                    # Nach Datum gruppieren
-                    visibility_by_date = {}
-                    for orbit in selected_launch["orbit_visibility"]:
-                        date = orbit["visibility_date"]
-                        if date not in visibility_by_date:
-                            visibility_by_date[date] = []
-                        visibility_by_date[date].append(orbit)
-                    
-                    # Balkendiagramm mit Sichtbarkeitsprozent
-                    visibility_data = []
-                    for orbit in selected_launch["orbit_visibility"]:
-                        orbit_time = orbit["time_de"].split(" ")[1]  # Nur die Uhrzeit
-                        visibility_data.append({
-                            "Umrundung": orbit["orbit_number"],
-                            "Zeit": orbit_time,
-                            "Datum": orbit["visibility_date"],
-                            "Sichtbarkeit (%)": orbit["visibility_chance"]
-                        })
-                    
-                    vis_df = pd.DataFrame(visibility_data)
+                    vis_df, tables_by_date = build_visibility_tables(
+                        selected_launch["id"],
+                        selected_launch["utc_time"],
+                        orbit_count,
+                        visibility_days,
+                        selected_launch["orbit_visibility"]
+                    )
                     
                     st.bar_chart(vis_df.set_index("Umrundung")["Sichtbarkeit (%)"])
                     
@@ -476,17 +442,8 @@ def main():
                     
                     # Sichtbarkeiten nach Datum anzeigen
                     st.subheader("Sichtbarkeit nach Datum")
-                    for date, orbits in visibility_by_date.items():
+                    for date, orbits_df in tables_by_date.items():
                         with st.expander(f"Datum: {date}"):
-                            orbits_df = pd.DataFrame([
-                                {
-                                    "Umrundung": o["orbit_number"],
-                                    "Uhrzeit (DE)": o["time_de"].split(" ")[1],
-                                    "Sichtbarkeitsfenster": f"{o['window_start']} - {o['window_end']}",
-                                    "Sichtbarkeit (%)": o["visibility_chance"],
-                                    "Qualität": o["visibility_text"]
-                                } for o in orbits
-                            ])
                             st.dataframe(orbits_df)
                     
                     # Detaillierte Informationen zu einzelnen Umrundungen
@@ -525,91 +482,120 @@ def main():
                 else:
                     st.warning("Keine Daten zur Berechnung der Umrundungen verfügbar.")
             
-            with tab3:
+            else:
                 # Karte mit dem Startort und Orbits
-                if selected_launch["coordinates"] and selected_launch["orbit_path"]:
+                if selected_launch["coordinates"]:
                     st.subheader("Startort und Umlaufbahn")
                     
-                    m = folium.Map(location=selected_launch["coordinates"], zoom_start=3)
-                    
-                    # Startort markieren
-                    folium.Marker(
-                        location=selected_launch["coordinates"],
-                        popup=f"{selected_launch['name']}<br>{selected_launch['location']}",
-                        icon=folium.Icon(icon="rocket", prefix="fa", color="red")
-                    ).add_to(m)
-                    
-                    # Deutschland markieren
-                    folium.Marker(
-                        location=germany_coords,
-                        popup="Deutschland",
-                        icon=folium.Icon(icon="home", prefix="fa", color="blue")
-                    ).add_to(m)
-                    
-                    # Orbit-Pfad zeichnen
-                    folium.PolyLine(
-                        locations=selected_launch["orbit_path"],
-                        color="orange",
-                        weight=2,
-                        opacity=0.7
-                    ).add_to(m)
-                    
-                    # Sichtbarkeitspunkte für die ersten Umrundungen visualisieren
-                    visible_orbits = [o for o in selected_launch["orbit_visibility"] if o.get("visibility_chance", 0) > 30]
-                    
-                    # Die Farbe basierend auf der Sichtbarkeit wählen
-                    def get_visibility_color(chance):
-                        if chance > 70:
-                            return "green"
-                        elif chance > 40:
-                            return "orange"
-                        elif chance > 20:
-                            return "yellow"
-                        else:
-                            return "red"
+                    # Anzahl der Umläufe und Auflösung der Bodenspur
+                    map_col1, map_col2 = st.columns(2)
+                    with map_col1:
+                        track_revolutions = st.slider("Umläufe auf der Karte", 1, 16, 1)
+                    with map_col2:
+                        track_resolution = st.select_slider(
+                            "Auflösung der Bahn (Grad)",
+                            options=[0.5, 1.0, 2.0, 5.0],
+                            value=5.0
+                        )
                     
-                    # Füge Sichtbarkeitspunkte zur Karte hinzu
-                    for orbit in visible_orbits[:10]:  # Begrenzen auf die ersten 10 für Übersichtlichkeit
-                        if "coords" in orbit:
-                            folium.CircleMarker(
-                                location=orbit["coords"],
-                                radius=5,
-                                popup=f"Umrundung {orbit['orbit_number']}<br>Sichtbarkeit: {orbit['visibility_chance']}%<br>Zeit (DE): {orbit['time_de']}",
-                                color=get_visibility_color(orbit["visibility_chance"]),
-                                fill=True,
-                                fill_opacity=0.8
-                            ).add_to(m)
+                    # Optionale Heatmap: beste Sichtbarkeit für ein Gitter von Beobachtungsorten
+                    show_heatmap = st.checkbox("Sichtbarkeits-Heatmap für viele Beobachtungsorte anzeigen", value=False)
+                    heatmap_region = None
+                    if show_heatmap:
+                        heatmap_region = st.radio("Gebiet der Heatmap", list(observer_regions), horizontal=True)
                     
-                    # Zeichne die Verbindung zwischen Deutschland und den sichtbaren Orbits
-                    for orbit in visible_orbits[:5]:  # Nur die ersten 5 für Übersichtlichkeit
-                        if "coords" in orbit and orbit.get("visibility_chance", 0) > 40:
-                            # AntPath für die Animation
-                            AntPath(
-                                locations=[germany_coords, orbit["coords"]],
-                                color=get_visibility_color(orbit["visibility_chance"]),
-                                weight=2,
-                                opacity=0.7,
-                                dash_array=[10, 20],
-                                pulse_color=get_visibility_color(orbit["visibility_chance"]),
-                                delay=800
-                            ).add_to(m)
+                    if show_heatmap:
+                        with st.spinner("Berechne Sichtbarkeit für das Beobachtungsgitter..."):
+                            visibility_grid = get_visibility_grid(
+                                selected_launch["coordinates"],
+                                selected_launch["utc_time"],
+                                selected_launch["mission_description"] or selected_launch["mission_type"],
+                                heatmap_region,
+                                orbit_count,
+                                visibility_days
+                            )
                     
-                    # Karte anzeigen
-                    folium_static(m)
+                    # Karte anzeigen (HTML pro Start und Einstellungen zwischengespeichert)
+                    map_html = render_launch_map(
+                        selected_launch["id"],
+                        selected_launch["utc_time"],
+                        orbit_count,
+                        visibility_days,
+                        track_revolutions,
+                        track_resolution,
+                        heatmap_region,
+                        selected_launch
+                    )
+                    components.html(map_html, height=510, width=700)
                     
                     # Erklärung zur Karte
                     st.markdown("""
                         **Erklärung zur Karte:**
                         - **Roter Marker**: Startort der Rakete
                         - **Blauer Marker**: Deutschland
-                        - **Orangene Linie**: Vereinfachte Darstellung der Umlaufbahn
-                        - **Farbige Punkte**: Positionen der Rakete während potenziell sichtbarer Umrundungen:
+                        - **Orangene Linie**: Vereinfachte Darstellung der Umlaufbahn (Bodenspur über die gewählten Umläufe)
+                        - **Farbige Punkte**: Positionen der Rakete am höchsten Punkt potenziell sichtbarer Überflüge:
                             - Grün: Sehr gute Sichtbarkeit (>70%)
                             - Orange: Gute Sichtbarkeit (40-70%)
                             - Gelb: Mäßige Sichtbarkeit (20-40%)
                             - Rot: Geringe Sichtbarkeit (<20%)
                         - **Animierte Linien**: Verbindungen zwischen Deutschland und gut sichtbaren Orbits
+                        - **Heatmap** (optional): Beste Sichtbarkeit je Beobachtungsort im gewählten Gebiet
                     """)
+                    
+                    if show_heatmap:
+                        best_cell = visibility_grid.loc[visibility_grid["best_visibility"].idxmax()]
+                        st.info(
+                            f"Beste Sichtbarkeit im Gebiet {heatmap_region}: {int(best_cell['best_visibility'])}% "
+                            f"bei {best_cell['latitude']:.2f}°N, {best_cell['longitude']:.2f}°E "
+                            f"(Umrundung {int(best_cell['best_orbit'])})"
+                        )
+                    
+                    # Sichtbarkeit für einen beliebigen Beobachtungsort
+                    st.subheader("Sichtbarkeit an deinem Standort")
+                    location_query = st.text_input(
+                        "Ort oder Koordinaten (Breite, Länge)",
+                        value="",
+                        placeholder="z.B. Hamburg oder 53.55, 9.99"
+                    )
+                    if location_query:
+                        try:
+                            observer_coords = geocode_location(location_query)
+                            location_error = None
+                        except (requests.exceptions.RequestException, ValueError) as e:
+                            observer_coords = None
+                            location_error = f"Fehler beim Abrufen der Koordinaten für {location_query}: {str(e)}"
+                        if location_error:
+                            st.error(location_error)
+                        elif observer_coords is None:
+                            st.warning(f"Konnte keine Koordinaten für {location_query} finden.")
+                        else:
+                            location_orbits = calculate_rocket_visibility(
+                                selected_launch["coordinates"],
+                                selected_launch["utc_time"],
+                                selected_launch["mission_description"] or selected_launch["mission_type"],
+                                total_orbits=orbit_count,
+                                visibility_days=visibility_days,
+                                observer_coords=observer_coords
+                            )
+                            if location_orbits:
+                                best_orbit = max(location_orbits, key=lambda o: o["visibility_chance"])
+                                st.markdown(
+                                    f"**{location_query}** ({observer_coords[0]:.2f}°N, {observer_coords[1]:.2f}°E): "
+                                    f"beste Sichtbarkeit {best_orbit['visibility_chance']}% bei Umrundung "
+                                    f"{best_orbit['orbit_number']} am {best_orbit['visibility_date']} "
+                                    f"({best_orbit['window_start']} - {best_orbit['window_end']} Uhr)"
+                                )
+                                st.dataframe(pd.DataFrame([
+                                    {
+                                        "Umrundung": o["orbit_number"],
+                                        "Zeit (DE)": o["time_de"],
+                                        "Sichtbarkeitsfenster": f"{o['window_start']} - {o['window_end']}",
+                                        "Sichtbarkeit (%)": o["visibility_chance"]
+                                    } for o in location_orbits
+                                ]))
+                            else:
+                                st.warning("Keine Umrundungen im Berechnungszeitraum.")
                 else:
                     st.warning("Keine Koordinaten oder Orbitdaten für die Kartenansicht verfügbar.")
             
@@ -626,14 +612,15 @@ def main():
                     - **Orbittyp**: Unterschiedliche Berechnungen für LEO (niedrige Erdumlaufbahn), MEO (mittlere Erdumlaufbahn), GEO (geostationäre Umlaufbahn) und SSO (sonnensynchrone Umlaufbahn)
                     
                     ### 2. Sichtbarkeitsfaktoren
-                    - **Entfernung**: Abstand zwischen Rakete und Beobachter (Deutschland)
-                    - **Tageszeit**: Nacht bietet bessere Sichtbarkeit als Tag
-                    - **Inklination**: Der Winkel der Umlaufbahn relativ zum Äquator (für Deutschland ist ~51° optimal)
+                    - **Höhenwinkel**: Die Bahn wird in kleinen Zeitschritten berechnet; sichtbar ist das Objekt erst ab 10° über dem Horizont des Beobachters
+                    - **Beleuchtung**: Das Objekt muss von der Sonne beleuchtet sein (nicht im Erdschatten)
+                    - **Dunkelheit**: Beim Beobachter muss die Sonne mindestens 6° unter dem Horizont stehen
+                    - **Himmelshelligkeit**: Je dunkler der Himmel und je höher der Überflug, desto besser die Sichtbarkeit
                     
                     ### 3. Zeitfensterberechnung
-                    - Die Sichtbarkeitsdauer hängt von der Qualität der Sichtbarkeit ab
-                    - Typischerweise 5-10 Minuten pro Überflug
-                    - Für jede Umrundung wird ein präzises Zeitfenster berechnet
+                    - Pro Umrundung wird der beste Überflug über dem Beobachter gesucht
+                    - Beginn und Ende des Zeitfensters werden per Bisektion auf wenige Sekunden genau bestimmt
+                    - Die angegebene Uhrzeit ist der höchste Punkt des Überflugs
                     
                     ### Wichtige Hinweise
                     
@@ -650,27 +637,8 @@ def main():
             # Tabelle mit allen bevorstehenden Starts
             st.header("Alle gefilterten Raketenstarts")
             
-            # DataFrame für die Tabelle erstellen
-            df_data = []
-            for launch in filtered_launches:
-                # Beste Sichtbarkeit berechnen
-                best_visibility = max([orb.get("visibility_chance", 0) for orb in launch["orbit_visibility"]]) if launch["orbit_visibility"] else 0
-                
-                # Anzahl guter Sichtbarkeitsfenster
-                good_visibility_count = len([o for o in launch["orbit_visibility"] if o.get("visibility_chance", 0) > 40])
-                
-                df_data.append({
-                    "Name": launch["name"],
-                    "Rakete": launch["rocket"],
-                    "Orbit": launch["orbit_type"],
-                    "Start (UTC)": launch["times"]["UTC"],
-                    "Start (DE)": launch["times"]["Deutschland"],
-                    "Beste Sichtbarkeit (%)": best_visibility,
-                    "Gute Sichtbarkeitsfenster": good_visibility_count,
-                    "Berechnete Umrundungen": len(launch["orbit_visibility"])
-                })
-            
-            df = pd.DataFrame(df_data)
+            # Übersicht mit bester Sichtbarkeit und Anzahl guter Sichtbarkeitsfenster pro Start
+            df = summarize_launches(filtered_launches, orbit_table)
             st.dataframe(df)
             
             # Download-Button für die Daten
@@ -705,3 +673,6 @@ def main():
         # Offline-Demo-Modus
         if st.button("Offline-Demo-Modus starten"):
             st.info("Der Offline-Demo-Modus würde hier Beispieldaten laden, wenn er implementiert wäre.")
+
+if __name__ == "__main__":
+    main()
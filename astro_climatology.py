@@ -0,0 +1,181 @@
+"""
+Klimatologie der klaren Nächte (Ort x Monat) für den Astrotourismus-Planer.
+
+Die durchschnittliche Anzahl klarer Nächte pro Monat wird einmal offline für
+alle Orte des Ortsverzeichnisses berechnet und als Matrix (.npy, float32)
+mit einer JSON-Datei gleichen Namens (Orte, Monate, Quelle) gespeichert. Die
+App öffnet die Matrix per Memory-Mapping und erhält die Tabelle mit den
+Monatsspalten in einem Aufruf. Orte, die nicht in der Tabelle stehen, werden
+mit demselben Modell berechnet, mit dem die Tabelle erzeugt wurde.
+
+Neu erzeugen (optional mit gemessenen Werten von Visual Crossing):
+    python astro_climatology.py
+    python astro_climatology.py --api-key <Visual-Crossing-Schlüssel>
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from astro_geocode import DATA_DIR, DEFAULT_GAZETTEER_PATH, load_gazetteer
+from astro_weather import MONTH_KEYS, ClearNightsHistory, average_months, history_years, site_key
+
+DEFAULT_CLIMATOLOGY_PATH = os.path.join(DATA_DIR, "clear_nights_climatology.npy")
+
+# Zuordnung der Monatsnamen der Auswahl zu den Spalten der Tabelle
+MONTH_TO_COLUMN = dict(zip(
+    ["Januar", "Februar", "März", "April", "Mai", "Juni",
+     "Juli", "August", "September", "Oktober", "November", "Dezember"],
+    MONTH_KEYS
+))
+
+# Ortstypen für das Modell (Teilstring des Ortsnamens, klein geschrieben)
+MOUNTAIN_KEYWORDS = ["alpen", "pyrenäen", "harz", "jura", "sierra", "tauern", "dolomiten", "feldberg"]
+COASTAL_KEYWORDS = ["hamburg", "rostock", "marseille", "barcelona", "valencia", "genf", "neapel"]
+
+# Klare Nächte pro Monat in Mitteleuropa und die monatlichen Zuschläge je Ortstyp
+_base = np.array([4, 5, 7, 9, 11, 12, 14, 13, 11, 8, 5, 3], dtype=np.float32)
+_southern = np.array([2, 2, 1, 1, 1, 2, 3, 3, 2, 2, 2, 2], dtype=np.float32)
+_mountain = np.array([1, 1, 1, 0, 0, 2, 2, 2, 1, 1, 0, 0], dtype=np.float32)
+_lowland = np.array([0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0], dtype=np.float32)
+_inland = np.array([0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 1, 1], dtype=np.float32)
+_coastal = np.array([1, 1, 1, 1, 0, 0, 0, 0, 0, 1, 1, 1], dtype=np.float32)
+
+
+def _has_keyword(names, keywords):
+    return np.array([any(keyword in name.lower() for keyword in keywords) for name in names], dtype=bool)
+
+
+def climatology_model(names, lats):
+    """
+    Modellwerte der klaren Nächte (Orte x 12 Monate) aus Breitengrad und Ortstyp:
+    mehr klare Nächte in Südeuropa (< 45°) und in den Bergen, weniger an der Küste
+    """
+    lats = np.asarray(lats, dtype=np.float32)
+    is_southern = (lats < 45.0)[:, None]
+    is_mountain = _has_keyword(names, MOUNTAIN_KEYWORDS)[:, None]
+    is_coastal = _has_keyword(names, COASTAL_KEYWORDS)[:, None]
+
+    values = (
+        _base
+        + is_southern * _southern
+        + is_mountain * _mountain
+        - ~is_mountain * _lowland
+        + ~is_coastal * _inland
+        - is_coastal * _coastal
+    )
+    return np.clip(values, 0, 30)
+
+
+class ClimatologyStore:
+    """
+    Memory-gemappte Tabelle der klaren Nächte (Orte x Monate)
+    """
+
+    def __init__(self, path=DEFAULT_CLIMATOLOGY_PATH):
+        with open(_metadata_path(path), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.path = path
+        self.sites = meta["sites"]
+        self.source = meta.get("source", "model")
+        self._index = {name: i for i, name in enumerate(self.sites)}
+        self._values = np.load(path, mmap_mode="r")
+
+    @classmethod
+    def open(cls, path=DEFAULT_CLIMATOLOGY_PATH):
+        """Öffnet die Tabelle oder gibt None zurück, wenn sie fehlt"""
+        if not os.path.exists(path) or not os.path.exists(_metadata_path(path)):
+            return None
+        return cls(path)
+
+    def values(self, names, lats):
+        """
+        Klare Nächte (Orte x 12 Monate) für die Orte; fehlende Orte aus dem Modell
+        """
+        rows = np.array([self._index.get(name, -1) for name in names], dtype=np.int64)
+        found = rows >= 0
+        values = np.empty((len(rows), len(MONTH_KEYS)), dtype=np.float32)
+        values[found] = self._values[rows[found]]
+        if not found.all():
+            missing = np.flatnonzero(~found)
+            values[missing] = climatology_model([names[i] for i in missing], np.asarray(lats)[missing])
+        return values
+
+
+def clear_nights_frame(names, values):
+    """
+    Tabelle mit einer Spalte pro Monat (Spaltennamen wie in MONTH_TO_COLUMN)
+    """
+    df = pd.DataFrame(np.asarray(values), columns=MONTH_KEYS)
+    df.insert(0, "Stadt", list(names))
+    return df
+
+
+def climatology_values(names, lats, store=None):
+    """
+    Klare Nächte (Orte x 12 Monate) aus der gespeicherten Tabelle oder, ohne Tabelle, aus dem Modell
+    """
+    if store is not None:
+        return store.values(names, lats)
+    return climatology_model(names, lats)
+
+
+def _metadata_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def build_climatology(sites, path=DEFAULT_CLIMATOLOGY_PATH, history=None, years=None):
+    """
+    Berechnet die Tabelle für sites = {Name: (lat, lon)} und speichert sie.
+    Mit history (astro_weather.ClearNightsHistory) werden gemessene Mittelwerte
+    verwendet, wo der Abruf gelingt, sonst die Modellwerte.
+    Gibt (Tabelle, Fehlermeldungen des Abrufs) zurück.
+    """
+    names = list(sites)
+    lats = [sites[name][0] for name in names]
+    values = climatology_model(names, lats)
+    source = "model"
+    errors = []
+
+    if history is not None:
+        years = years or history_years(3)
+        measured, errors = history.monthly_clear_nights([sites[name] for name in names], years)
+        n_measured = 0
+        for i, name in enumerate(names):
+            averages = average_months(measured[site_key(*sites[name])])
+            if averages is not None:
+                values[i] = [averages[month] for month in MONTH_KEYS]
+                n_measured += 1
+        source = f"visualcrossing {min(years)}-{max(years)} ({n_measured}/{len(names)} Orte)"
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.save(path, values.astype(np.float32))
+    with open(_metadata_path(path), "w", encoding="utf-8") as f:
+        json.dump({"sites": names, "months": MONTH_KEYS, "source": source}, f, ensure_ascii=False, indent=2)
+    return values, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Klimatologie der klaren Nächte erzeugen")
+    parser.add_argument("--gazetteer", default=DEFAULT_GAZETTEER_PATH, help="Ortsverzeichnis (JSON)")
+    parser.add_argument("--output", default=DEFAULT_CLIMATOLOGY_PATH, help="Ziel (.npy)")
+    parser.add_argument("--api-key", default=None, help="Visual-Crossing-Schlüssel für gemessene Werte")
+    args = parser.parse_args()
+
+    history = None
+    if args.api_key:
+        history = ClearNightsHistory(args.api_key)
+
+    sites = load_gazetteer(args.gazetteer)
+    _, errors = build_climatology(sites, args.output, history)
+    print(f"{len(sites)} Orte nach {args.output} geschrieben")
+    for error in errors:
+        print(f"Warnung: {error}")
+
+
+if __name__ == "__main__":
+    main()
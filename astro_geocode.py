@@ -0,0 +1,232 @@
+"""
+Persistenter Geocoding-Cache für den Astrotourismus-Planer.
+
+Die Koordinaten der Orte liegen in einer SQLite-Datenbank, die beim ersten
+Start aus dem mitgelieferten Ortsverzeichnis (data/astro_gazetteer.json)
+befüllt wird. Nur Namen, die weder dort noch in der Datenbank stehen, werden
+über Nominatim nachgeschlagen - in einem Hintergrund-Thread und höchstens eine
+Anfrage pro Sekunde (Nutzungsrichtlinie von Nominatim). Abfragen blockieren
+also nie auf das Netzwerk.
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import requests
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "AstroTourismApp/1.0"
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_GAZETTEER_PATH = os.path.join(DATA_DIR, "astro_gazetteer.json")
+
+# Standardverzeichnis für die Datenbank (per Umgebungsvariable änderbar)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ASTRO_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".astro_cache")
+)
+
+
+def load_gazetteer(path=DEFAULT_GAZETTEER_PATH):
+    """
+    Liest das Ortsverzeichnis ({Name: [Breitengrad, Längengrad]}); leer, wenn die Datei fehlt
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {name: (float(lat), float(lon)) for name, (lat, lon) in entries.items()}
+
+
+class GeocodeStore:
+    """
+    Festplattenbasierter Geocoding-Cache (Ortsname -> (lat, lon)).
+
+    Unbekannte Namen werden im Hintergrund über Nominatim aufgelöst; bis dahin
+    liefert lookup() None. Auch erfolglose Anfragen werden gespeichert, damit
+    derselbe Name nicht bei jedem Start erneut angefragt wird.
+    """
+
+    # Drosselung gemeinsam für alle Instanzen im Prozess (Nutzungsrichtlinie von Nominatim)
+    _request_lock = threading.Lock()
+    _last_request = 0.0
+
+    def __init__(
+        self,
+        cache_dir=DEFAULT_CACHE_DIR,
+        gazetteer_path=DEFAULT_GAZETTEER_PATH,
+        min_interval=1.0,
+        timeout=10,
+        session=None
+    ):
+        self.cache_dir = cache_dir
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._queued = set()
+        # Fehlgeschlagene Anfragen dieses Prozesses (Name -> Fehlermeldung)
+        self._errors = {}
+        self._thread = None
+        self._version = 0
+
+        self._db = self._connect()
+        self._seed(load_gazetteer(gazetteer_path))
+        # Alle bekannten Orte im Speicher halten: Abfragen sind reine Dictionary-Zugriffe
+        self._places = {
+            name: (lat, lon) if lat is not None else None
+            for name, lat, lon in self._db.execute("SELECT name, lat, lon FROM places")
+        }
+
+    @property
+    def db_path(self):
+        return os.path.join(self.cache_dir, "geocode.sqlite")
+
+    @property
+    def version(self):
+        """Zähler, der sich bei jedem neu aufgelösten Ort erhöht (z.B. als Cache-Schlüssel)"""
+        return self._version
+
+    def lookup(self, place):
+        """
+        Koordinaten (lat, lon) eines Ortes oder None, wenn er (noch) nicht bekannt ist.
+        Unbekannte Orte werden zur Geokodierung im Hintergrund eingereiht.
+        """
+        if place in self._places:
+            return self._places[place]
+        if place not in self._errors:
+            self._enqueue(place)
+        return None
+
+    def error(self, place):
+        """Fehlermeldung, falls die Geokodierung des Ortes in diesem Prozess fehlschlug, sonst None"""
+        return self._errors.get(place)
+
+    def lookup_many(self, places):
+        """Koordinaten für mehrere Orte als {Name: (lat, lon) oder None}"""
+        return {place: self.lookup(place) for place in places}
+
+    def pending(self):
+        """Anzahl der Orte, die noch auf die Geokodierung warten"""
+        with self._lock:
+            return len(self._queued)
+
+    def wait(self, timeout=None):
+        """Wartet, bis alle eingereihten Orte verarbeitet sind; True, wenn keiner mehr aussteht"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _enqueue(self, place):
+        with self._lock:
+            if place in self._queued:
+                return
+            self._queued.add(place)
+            self._queue.put(place)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, daemon=True)
+                self._thread.start()
+
+    def _worker(self):
+        while True:
+            try:
+                place = self._queue.get(timeout=5)
+            except queue.Empty:
+                # Thread beenden, wenn nichts mehr zu tun ist (wird bei Bedarf neu gestartet)
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            try:
+                coords = self._geocode(place)
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                # Nicht speichern: beim nächsten Start erneut versuchen
+                self.last_error = f"Fehler beim Abrufen der Koordinaten für {place}: {str(e)}"
+                with self._lock:
+                    self._errors[place] = self.last_error
+                    self._queued.discard(place)
+                continue
+
+            self._store(place, coords, "nominatim")
+            with self._lock:
+                self._places[place] = coords
+                self._queued.discard(place)
+                self._version += 1
+
+    def _geocode(self, place):
+        """Eine Nominatim-Anfrage, gedrosselt auf eine pro min_interval Sekunden (über alle Instanzen)"""
+        with GeocodeStore._request_lock:
+            wait = GeocodeStore._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                response = self.session.get(
+                    NOMINATIM_URL,
+                    params={"q": place, "format": "json", "limit": 1},
+                    headers={"User-Agent": USER_AGENT},
+                    timeout=self.timeout
+                )
+            finally:
+                GeocodeStore._last_request = time.monotonic()
+        response.raise_for_status()
+
+        data = response.json()
+        if not data:
+            return None
+        return float(data[0]["lat"]), float(data[0]["lon"])
+
+    def _connect(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._create_table(db)
+        except (OSError, sqlite3.Error):
+            # Ohne schreibbares Verzeichnis bleibt der Cache nur im Speicher
+            db = sqlite3.connect(":memory:", check_same_thread=False)
+            self._create_table(db)
+        return db
+
+    @staticmethod
+    def _create_table(db):
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS places ("
+            "name TEXT PRIMARY KEY, lat REAL, lon REAL, source TEXT, updated_at REAL)"
+        )
+        db.commit()
+
+    def _seed(self, gazetteer):
+        """Übernimmt Einträge des Ortsverzeichnisses, die noch nicht in der Datenbank stehen"""
+        now = time.time()
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO places VALUES (?, ?, ?, 'gazetteer', ?)",
+                    [(name, lat, lon, now) for name, (lat, lon) in gazetteer.items()]
+                )
+        except sqlite3.Error as e:
+            self.last_error = f"Fehler beim Befüllen des Geocoding-Caches: {str(e)}"
+
+    def _store(self, place, coords, source):
+        lat, lon = coords if coords is not None else (None, None)
+        try:
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?)",
+                    (place, lat, lon, source, time.time())
+                )
+        except sqlite3.Error as e:
+            self.last_error = f"Fehler beim Speichern der Koordinaten für {place}: {str(e)}"
@@ -0,0 +1,180 @@
+"""
+Astro-Score auf einem regelmäßigen Gitter für den Astrotourismus-Planer.
+
+Statt nur die festen Orte zu bewerten, wird der Score für jede Zelle eines
+Breiten-/Längengrad-Gitters über das gewählte Land berechnet - vollständig
+vektorisiert, auch für Hunderttausende Zellen:
+
+- Lichtverschmutzung aus dem Himmelshelligkeits-Raster (astro_raster) oder,
+  ohne Raster, aus der Entfernung zur nächsten Großstadt
+- Klare Nächte und mondfreie Dunkelstunden per inverser Distanzgewichtung
+  aus den Werten der Orte
+- Normalisierung und Gewichtung wie beim Score der Orte (astro_score)
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+import numpy as np
+import pandas as pd
+
+# Grenzen (Süd, Nord, West, Ost) der auswählbaren Länder als umschließende Rechtecke
+country_bounds = {
+    "Deutschland": (47.2, 55.1, 5.8, 15.1),
+    "Österreich": (46.3, 49.1, 9.5, 17.2),
+    "Schweiz": (45.8, 47.9, 5.9, 10.5),
+    "Frankreich": (42.3, 51.1, -4.8, 8.3),
+    "Italien": (36.6, 47.1, 6.6, 18.6),
+    "Spanien": (36.0, 43.8, -9.4, 3.4),
+    "Alle": (36.0, 55.1, -9.4, 18.6)
+}
+
+# Größere Städte (lat, lon) für die Schätzung der Lichtverschmutzung ohne Raster
+MAJOR_CITIES = np.array([
+    (52.5200, 13.4050),  # Berlin
+    (48.8566, 2.3522),   # Paris
+    (41.9028, 12.4964),  # Rom
+    (40.4168, -3.7038),  # Madrid
+    (48.2082, 16.3738),  # Wien
+    (47.3769, 8.5417),   # Zürich
+    (48.1351, 11.5820),  # München
+    (53.5511, 9.9937)    # Hamburg
+])
+
+# Entfernung zur nächsten Großstadt (Grad) -> Lichtverschmutzung
+_city_distance_limits = np.array([0.05, 0.1, 0.2, 0.5])
+_city_distance_levels = np.array([9, 7, 5, 3, 1])
+
+# Zeilen pro Block bei der Interpolation (Zellen x Orte)
+INTERPOLATION_BLOCK = 16384
+
+# Obergrenze der Zellen pro Gitter (bestimmt auch die Datenmenge für die Karte)
+MAX_GRID_CELLS = 250000
+
+
+def grid_points(bounds, step):
+    """
+    Mittelpunkte der Gitterzellen als flache Arrays (lat, lon)
+    """
+    south, north, west, east = bounds
+    lats = np.arange(south + step / 2, north, step)
+    lons = np.arange(west + step / 2, east, step)
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+    return lat_grid.ravel(), lon_grid.ravel()
+
+
+def limit_step(bounds, step, max_cells=MAX_GRID_CELLS):
+    """
+    Vergrößert die Schrittweite so weit, dass das Gitter höchstens max_cells Zellen hat
+    """
+    south, north, west, east = bounds
+    min_step = np.sqrt((north - south) * (east - west) / max_cells)
+    return step if step >= min_step else float(np.ceil(min_step * 1000) / 1000)
+
+
+def simulated_light_pollution(lat, lon):
+    """
+    Lichtverschmutzung (1-10) aus der Entfernung zur nächsten Großstadt
+    (Luftlinie in Grad), für beliebig viele Punkte
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    min_dist = np.full(lat.shape, np.inf)
+    for city_lat, city_lon in MAJOR_CITIES:
+        np.minimum(min_dist, np.hypot(lat - city_lat, lon - city_lon), out=min_dist)
+    return _city_distance_levels[np.searchsorted(_city_distance_limits, min_dist, side="right")]
+
+
+def interpolate_site_values(lat, lon, site_lat, site_lon, site_values, power=2.0):
+    """
+    Inverse Distanzgewichtung der Werte der Orte auf beliebig viele Punkte.
+    Rechnet blockweise, damit die Distanzmatrix klein bleibt.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    site_lat = np.asarray(site_lat, dtype=np.float64)
+    site_lon = np.asarray(site_lon, dtype=np.float64)
+    site_values = np.asarray(site_values, dtype=np.float64)
+
+    result = np.empty(lat.shape)
+    # Längengrade schrumpfen mit der Breite
+    lon_scale = np.cos(np.radians(np.mean(site_lat))) if len(site_lat) else 1.0
+    for start in range(0, len(lat), INTERPOLATION_BLOCK):
+        stop = start + INTERPOLATION_BLOCK
+        d_lat = lat[start:stop, None] - site_lat[None, :]
+        d_lon = (lon[start:stop, None] - site_lon[None, :]) * lon_scale
+        weights = 1.0 / np.maximum(d_lat ** 2 + d_lon ** 2, 1e-6) ** (power / 2)
+        result[start:stop] = weights @ site_values / weights.sum(axis=1)
+    return result
+
+
+def astro_scores(light_pollution, clear_nights, light_weight, clear_weight, dark_hours=None, dark_weight=0.0):
+    """
+    Normalisierte Werte und Astro-Score wie bei SiteScoreMatrix.scores.
+    Gibt (Lichtverschmutzung_norm, Klare_Nächte_norm, Astro_Score, Astro_Score_10) zurück.
+    """
+    light_norm = 1 - light_pollution / np.max(light_pollution)
+    max_clear = np.max(clear_nights)
+    clear_norm = clear_nights / max_clear if max_clear > 0 else np.zeros_like(clear_nights)
+    score = light_norm * light_weight + clear_norm * clear_weight
+    if dark_hours is not None:
+        max_dark = np.max(dark_hours)
+        score = score + (dark_hours / max_dark if max_dark > 0 else 0.0) * dark_weight
+    return light_norm, clear_norm, score, score * 9 + 1
+
+
+def compute_grid_scores(
+    bounds,
+    step,
+    site_lat,
+    site_lon,
+    site_clear_nights,
+    light_weight,
+    clear_weight,
+    raster=None,
+    site_dark_hours=None,
+    dark_weight=0.0
+):
+    """
+    Astro-Score für jede Gitterzelle innerhalb von bounds.
+
+    site_*: Koordinaten, durchschnittliche klare Nächte und (optional) mondfreie
+    Dunkelstunden pro Nacht der bekannten Orte.
+    raster: SkyBrightnessRaster oder None (dann geschätzte Lichtverschmutzung).
+    Gibt einen DataFrame mit den Spalten der Ortstabelle (ohne Stadt/Land) zurück.
+    """
+    lat, lon = grid_points(bounds, step)
+
+    light_pollution = simulated_light_pollution(lat, lon).astype(np.float64)
+    if raster is not None:
+        measured = raster.light_pollution(lat, lon)
+        light_pollution = np.where(np.isnan(measured), light_pollution, measured)
+
+    clear_nights = interpolate_site_values(lat, lon, site_lat, site_lon, site_clear_nights)
+    dark_hours = None
+    if site_dark_hours is not None:
+        dark_hours = interpolate_site_values(lat, lon, site_lat, site_lon, site_dark_hours)
+    light_norm, clear_norm, score, score_10 = astro_scores(
+        light_pollution, clear_nights, light_weight, clear_weight, dark_hours, dark_weight
+    )
+
+    return pd.DataFrame({
+        "Breitengrad": lat.astype(np.float32),
+        "Längengrad": lon.astype(np.float32),
+        "Lichtverschmutzung": light_pollution.astype(np.int8),
+        "Lichtverschmutzung_norm": light_norm.astype(np.float32),
+        "Durchschnitt_Klare_Nächte": clear_nights.astype(np.float32),
+        "Klare_Nächte_norm": clear_norm.astype(np.float32),
+        "Astro_Score": score.astype(np.float32),
+        "Astro_Score_10": score_10.astype(np.float32)
+    })
+
+
+def top_k_indices(scores, k):
+    """
+    Indizes der k höchsten Werte, absteigend sortiert (Teilsortierung mit argpartition)
+    """
+    scores = np.asarray(scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+    return top[np.argsort(scores[top])[::-1]]
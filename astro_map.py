@@ -0,0 +1,119 @@
+"""
+Kartendarstellung der Orte für den Astrotourismus-Planer.
+
+Alle Orte werden als eine einzige GeoJSON-FeatureCollection in die Karte
+geschrieben. Kreis, Farbe und Popup entstehen erst im Browser aus den
+Properties jedes Features; die Farben der Farbskala stehen nur einmal als
+Palette im HTML, die Features verweisen per Index darauf. Dadurch wächst die
+Karte pro Ort nur um wenige Bytes und wird ohne Schleife über die Zeilen
+aufgebaut.
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+import html
+
+import branca.colormap as cm
+import folium
+import numpy as np
+from branca.element import MacroElement
+from jinja2 import Template
+
+# Anzahl der Farbstufen der Palette (zwischen Minimum und Maximum des Scores)
+PALETTE_SIZE = 64
+
+
+class SiteLayer(MacroElement):
+    """
+    Orte als ein GeoJSON-Layer mit CircleMarkern, Farbe und Popup aus den Properties
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }}_palette = {{ this.palette|tojson }};
+        var {{ this.get_name() }} = L.geoJSON({{ this.data|tojson }}, {
+            pointToLayer: function (feature, latlng) {
+                var color = {{ this.get_name() }}_palette[feature.properties.c];
+                return L.circleMarker(latlng, {
+                    radius: {{ this.radius }},
+                    color: color,
+                    fillColor: color,
+                    fillOpacity: {{ this.fill_opacity }}
+                });
+            },
+            onEachFeature: function (feature, layer) {
+                var p = feature.properties;
+                layer.bindPopup(
+                    "<b>" + p.name + ", " + p.country + "</b><br>" +
+                    "Astro-Score: " + p.score.toFixed(1) + "/10<br>" +
+                    "Lichtverschmutzung: " + p.light + "/10<br>" +
+                    "Klare Nächte pro Monat: " + p.clear.toFixed(1),
+                    {maxWidth: 300}
+                );
+            }
+        }).addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, data, palette, radius=10, fill_opacity=0.7):
+        super().__init__()
+        self._name = "SiteLayer"
+        self.data = data
+        self.palette = palette
+        self.radius = radius
+        self.fill_opacity = fill_opacity
+
+
+def site_features(df, vmin, vmax, palette_size=PALETTE_SIZE):
+    """
+    FeatureCollection der Orte; die Farbe ist ein Index in die Palette (spaltenweise berechnet)
+    """
+    scores = df['Astro_Score_10'].to_numpy(dtype=float)
+    span = vmax - vmin
+    if span > 0:
+        color_index = np.rint((scores - vmin) / span * (palette_size - 1)).astype(int)
+    else:
+        color_index = np.zeros(len(scores), dtype=int)
+
+    columns = zip(
+        df['Längengrad'].round(5).tolist(),
+        df['Breitengrad'].round(5).tolist(),
+        [html.escape(str(name)) for name in df['Stadt']],
+        [html.escape(str(country)) for country in df['Land']],
+        np.round(scores, 2).tolist(),
+        df['Lichtverschmutzung'].astype(int).tolist(),
+        df['Durchschnitt_Klare_Nächte'].round(2).tolist(),
+        np.clip(color_index, 0, palette_size - 1).tolist()
+    )
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": {"name": name, "country": country, "score": score, "light": light, "clear": clear, "c": c}
+            }
+            for lon, lat, name, country, score, light, clear, c in columns
+        ]
+    }
+
+
+def render_site_map(df, location=(50.1109, 8.6821), zoom_start=5):
+    """
+    Karte aller bewerteten Orte als HTML (eine GeoJSON-Ebene plus Farblegende)
+    """
+    m = folium.Map(location=list(location), zoom_start=zoom_start)
+
+    if len(df):
+        vmin = float(df['Astro_Score_10'].min())
+        vmax = float(df['Astro_Score_10'].max())
+        # Farbskala für den Astro-Score
+        colormap = cm.LinearColormap(colors=['red', 'yellow', 'green'], vmin=vmin, vmax=vmax)
+        palette = [colormap.rgb_hex_str(v) for v in np.linspace(vmin, vmax, PALETTE_SIZE)]
+
+        m.add_child(SiteLayer(site_features(df, vmin, vmax), palette))
+
+        # Legende zur Karte hinzufügen
+        colormap.caption = 'Astro-Score (1-10)'
+        colormap.add_to(m)
+
+    # Wie folium_static: Karte in eine Figure einbetten und als HTML rendern
+    return folium.Figure().add_child(m).render()
@@ -0,0 +1,180 @@
+"""
+Himmelshelligkeits-Raster (World Atlas of Artificial Night Sky Brightness) für
+den Astrotourismus-Planer.
+
+Das Raster liegt als .npy-Datei vor und wird per Memory-Mapping geöffnet: bei
+einer Abfrage werden nur die Seiten gelesen, in denen die gesuchten Zellen
+liegen, nie das ganze Raster. Die Georeferenz steht in einer JSON-Datei
+gleichen Namens:
+
+    {"west": -11.0, "north": 71.0, "cell_width": 0.00833, "cell_height": 0.00833,
+     "nodata": -1.0, "units": "mcd/m2"}
+
+Der GeoTIFF des World Atlas lässt sich mit convert_geotiff() (benötigt
+rasterio) umwandeln und dabei auf eine Region zuschneiden:
+
+    python astro_raster.py World_Atlas_2015.tif data/sky_brightness.npy --bounds 35 71 -11 40
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Standardpfad des Rasters (per Umgebungsvariable änderbar)
+DEFAULT_RASTER_PATH = os.environ.get("ASTRO_SKY_RASTER", os.path.join(DATA_DIR, "sky_brightness.npy"))
+
+# Künstliche Himmelshelligkeit (mcd/m²) als Klassengrenzen der Lichtverschmutzungsskala 1-10.
+# Natürlicher Himmel ca. 0.171 mcd/m²; unter 1% davon gilt als unbelastet (1),
+# ab dem ca. 50-fachen des natürlichen Himmels als Großstadtzentrum (10).
+BRIGHTNESS_LEVELS = np.array([0.0017, 0.006, 0.017, 0.045, 0.14, 0.35, 0.9, 2.5, 8.5])
+
+
+def brightness_to_scale(brightness):
+    """
+    Ordnet Himmelshelligkeiten (mcd/m²) der Skala 1-10 zu (NaN bleibt NaN)
+    """
+    brightness = np.asarray(brightness, dtype=np.float64)
+    scale = np.searchsorted(BRIGHTNESS_LEVELS, brightness, side="right") + 1.0
+    scale[np.isnan(brightness)] = np.nan
+    return scale
+
+
+def _metadata_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+class SkyBrightnessRaster:
+    """
+    Memory-gemapptes Raster der künstlichen Himmelshelligkeit mit
+    vektorisierter Punktabfrage
+    """
+
+    def __init__(self, path=DEFAULT_RASTER_PATH):
+        with open(_metadata_path(path), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.path = path
+        self.west = float(meta["west"])
+        self.north = float(meta["north"])
+        self.cell_width = float(meta["cell_width"])
+        self.cell_height = float(meta["cell_height"])
+        self.nodata = meta.get("nodata")
+        self.units = meta.get("units", "mcd/m2")
+
+        self._data = np.load(path, mmap_mode="r")
+        if self._data.ndim != 2:
+            raise ValueError(f"Raster {path} ist nicht zweidimensional")
+
+    @classmethod
+    def open(cls, path=DEFAULT_RASTER_PATH):
+        """Öffnet das Raster oder gibt None zurück, wenn Datei oder Georeferenz fehlen"""
+        if not os.path.exists(path) or not os.path.exists(_metadata_path(path)):
+            return None
+        return cls(path)
+
+    @property
+    def shape(self):
+        return self._data.shape
+
+    @property
+    def bounds(self):
+        """(Süd, Nord, West, Ost) in Grad"""
+        rows, cols = self._data.shape
+        return (
+            self.north - rows * self.cell_height,
+            self.north,
+            self.west,
+            self.west + cols * self.cell_width
+        )
+
+    def brightness(self, lat, lon):
+        """
+        Himmelshelligkeit für beliebig viele Punkte in einem Aufruf.
+        Punkte außerhalb des Rasters und Nodata-Zellen ergeben NaN.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        rows = np.floor((self.north - lat) / self.cell_height)
+        cols = np.floor((lon - self.west) / self.cell_width)
+        n_rows, n_cols = self._data.shape
+        inside = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+
+        result = np.full(lat.shape, np.nan)
+        if not inside.any():
+            return result
+
+        # Zellen sortiert und ohne Duplikate lesen: jede Seite der Datei wird höchstens einmal berührt
+        flat_index = rows[inside].astype(np.int64) * n_cols + cols[inside].astype(np.int64)
+        cells, inverse = np.unique(flat_index, return_inverse=True)
+        values = np.asarray(self._data.reshape(-1)[cells], dtype=np.float64)
+        if self.nodata is not None:
+            values[values == self.nodata] = np.nan
+        result[inside] = values[inverse]
+        return result
+
+    def light_pollution(self, lat, lon):
+        """Lichtverschmutzung auf der Skala 1-10 der App (NaN außerhalb des Rasters)"""
+        return brightness_to_scale(self.brightness(lat, lon))
+
+
+def convert_geotiff(src_path, dst_path, bounds=None, block_rows=512):
+    """
+    Wandelt einen GeoTIFF (z.B. World_Atlas_2015.tif) in das .npy-Format mit
+    Georeferenz um, optional zugeschnitten auf bounds = (Süd, Nord, West, Ost).
+    Liest blockweise, der Speicherbedarf bleibt unabhängig von der Rastergröße.
+    """
+    try:
+        import rasterio
+        from rasterio.windows import Window, from_bounds
+    except ImportError:
+        raise RuntimeError("Für die Umwandlung wird rasterio benötigt (pip install rasterio)")
+
+    with rasterio.open(src_path) as src:
+        if bounds is not None:
+            south, north, west, east = bounds
+            window = from_bounds(west, south, east, north, transform=src.transform)
+            window = window.round_offsets().round_lengths().intersection(Window(0, 0, src.width, src.height))
+        else:
+            window = Window(0, 0, src.width, src.height)
+        transform = src.window_transform(window)
+        rows, cols = int(window.height), int(window.width)
+
+        out = np.lib.format.open_memmap(dst_path, mode="w+", dtype=np.float32, shape=(rows, cols))
+        for start in range(0, rows, block_rows):
+            n = min(block_rows, rows - start)
+            block = Window(window.col_off, window.row_off + start, cols, n)
+            out[start:start + n] = src.read(1, window=block).astype(np.float32)
+        out.flush()
+        del out
+
+        meta = {
+            "west": transform.c,
+            "north": transform.f,
+            "cell_width": transform.a,
+            "cell_height": -transform.e,
+            "nodata": src.nodata,
+            "units": "mcd/m2"
+        }
+    with open(_metadata_path(dst_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return rows, cols
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Himmelshelligkeits-GeoTIFF in ein Memory-Map-Raster umwandeln")
+    parser.add_argument("source", help="GeoTIFF des World Atlas (mcd/m²)")
+    parser.add_argument("target", nargs="?", default=DEFAULT_RASTER_PATH, help="Ziel (.npy)")
+    parser.add_argument("--bounds", type=float, nargs=4, metavar=("SÜD", "NORD", "WEST", "OST"),
+                        help="Auf Region zuschneiden")
+    args = parser.parse_args()
+
+    rows, cols = convert_geotiff(args.source, args.target, args.bounds)
+    print(f"{rows} x {cols} Zellen nach {args.target} geschrieben")
+
+
+if __name__ == "__main__":
+    main()
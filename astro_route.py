@@ -0,0 +1,118 @@
+"""
+Tourenplanung über die bestbewerteten Orte für den Astrotourismus-Planer.
+
+Aus den Kandidaten (z.B. den besten N Orten) wird eine Route mit einer Nacht
+pro Ort ab einem Startort gebildet:
+
+1. Nächster Nachbar mit Bonus für den Astro-Score: als nächstes Ziel wird der
+   Ort gewählt, für den Entfernung minus km_per_point x Score am kleinsten
+   ist, solange die Etappe höchstens max_leg_km lang ist.
+2. 2-opt: die Reihenfolge der gewählten Orte wird verbessert, indem
+   Teilstücke umgedreht werden, solange das die Strecke verkürzt und keine
+   Etappe länger als max_leg_km wird. Alle Umkehrungen einer Runde werden
+   gleichzeitig als Array bewertet.
+
+Die Entfernungen (Großkreis, km) kommen aus einer Matrix, die einmal pro
+Ortsmenge berechnet wird.
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_matrix(lat, lon, lat2=None, lon2=None):
+    """
+    Großkreisentfernungen in km zwischen allen Punkten (lat, lon) und (lat2, lon2)
+    (ohne zweite Punktmenge: zwischen allen Punkten untereinander)
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))[:, None]
+    lon = np.radians(np.asarray(lon, dtype=np.float64))[:, None]
+    lat2 = lat.T if lat2 is None else np.radians(np.asarray(lat2, dtype=np.float64))[None, :]
+    lon2 = lon.T if lon2 is None else np.radians(np.asarray(lon2, dtype=np.float64))[None, :]
+    a = np.sin((lat2 - lat) / 2) ** 2 + np.cos(lat) * np.cos(lat2) * np.sin((lon2 - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_neighbour_route(dist, start_dist, scores, n_stops, max_leg_km=None, km_per_point=50.0):
+    """
+    Wählt nacheinander bis zu n_stops Kandidaten (Indizes) ab dem Startort.
+
+    dist: Entfernungen zwischen den Kandidaten, start_dist: vom Startort zu
+    jedem Kandidaten, scores: Astro-Score der Kandidaten (z.B. 1-10).
+    Endet früher, wenn kein Kandidat mehr innerhalb von max_leg_km liegt.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    visited = np.zeros(len(scores), dtype=bool)
+    limit = np.inf if max_leg_km is None else max_leg_km
+    route = []
+    legs = np.asarray(start_dist, dtype=np.float64)
+    for _ in range(min(n_stops, len(scores))):
+        cost = legs - km_per_point * scores
+        cost[visited | (legs > limit)] = np.inf
+        best = int(np.argmin(cost))
+        if not np.isfinite(cost[best]):
+            break
+        route.append(best)
+        visited[best] = True
+        legs = dist[best]
+    return route
+
+
+def two_opt(path_dist, max_leg_km=None):
+    """
+    Verbessert die Reihenfolge eines offenen Pfads mit festem Anfang (Knoten 0).
+
+    path_dist: Entfernungen zwischen den Knoten in Pfadreihenfolge. Gibt die
+    neue Reihenfolge als Indizes in path_dist zurück (beginnt immer mit 0).
+    """
+    n = len(path_dist)
+    order = np.arange(n)
+    if n < 4:
+        return order
+    limit = np.inf if max_leg_km is None else max_leg_km
+
+    # Umkehrung von order[i..j] für alle 1 <= i < j <= n-1
+    i, j = np.triu_indices(n, k=1)
+    valid = i >= 1
+    i, j = i[valid], j[valid]
+    while True:
+        d = path_dist[np.ix_(order, order)]
+        before = d[i - 1, i]
+        new_first = d[i - 1, j]
+        # Am offenen Ende entfällt die Etappe nach j
+        has_next = j < n - 1
+        after = np.where(has_next, d[j, np.minimum(j + 1, n - 1)], 0.0)
+        new_second = np.where(has_next, d[i, np.minimum(j + 1, n - 1)], 0.0)
+
+        delta = new_first + new_second - before - after
+        delta[(new_first > limit) | (new_second > limit)] = np.inf
+        best = int(np.argmin(delta))
+        if delta[best] >= -1e-9:
+            return order
+        order[i[best]:j[best] + 1] = order[i[best]:j[best] + 1][::-1]
+
+
+def plan_route(dist, start_dist, scores, n_stops, max_leg_km=None, km_per_point=50.0):
+    """
+    Route ab dem Startort über bis zu n_stops Kandidaten (eine Nacht pro Ort).
+
+    Gibt (Indizes der Kandidaten in Reisereihenfolge, Etappenlängen in km) zurück;
+    die erste Etappe führt vom Startort zum ersten Ort.
+    """
+    route = nearest_neighbour_route(dist, start_dist, scores, n_stops, max_leg_km, km_per_point)
+    if not route:
+        return [], np.empty(0)
+
+    # Pfad-Matrix mit dem Startort als Knoten 0
+    nodes = np.asarray(route)
+    path_dist = np.empty((len(nodes) + 1, len(nodes) + 1))
+    path_dist[0, 0] = 0.0
+    path_dist[0, 1:] = path_dist[1:, 0] = np.asarray(start_dist)[nodes]
+    path_dist[1:, 1:] = dist[np.ix_(nodes, nodes)]
+
+    order = two_opt(path_dist, max_leg_km)
+    route = nodes[order[1:] - 1].tolist()
+    legs = path_dist[order[:-1], order[1:]]
+    return route, legs
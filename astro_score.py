@@ -0,0 +1,97 @@
+"""
+Schnelle Neuberechnung des Astro-Scores der Orte für den Astrotourismus-Planer.
+
+Die normalisierte Lichtverschmutzung, die klaren Nächte der zwölf Monate und
+die mondfreien Dunkelstunden pro Nacht der zwölf Monate (astro_sky) liegen
+als eine zusammenhängende Matrix (Orte x 25, float64) vor, die Zeilen nach
+Land gruppiert. Eine Änderung der Gewichtung oder der Monate ist damit
+ein einziges Matrix-Vektor-Produkt über alle Orte, auf deren Maximum auch
+normalisiert wird; danach wird der Block des Landes herausgeschnitten. Die
+besten Orte bestimmt die App daraus per Teilsortierung (astro_grid.top_k_indices).
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+import numpy as np
+
+from astro_weather import MONTH_KEYS
+
+
+class SiteScoreMatrix:
+    """
+    Lichtverschmutzung_norm, klare Nächte und mondfreie Dunkelstunden pro
+    Monat aller Orte als Matrix mit einem zusammenhängenden Zeilenblock pro Land
+    """
+
+    def __init__(self, light_norm, clear_nights, countries, dark_hours=None):
+        n_months = len(MONTH_KEYS)
+        light_norm = np.asarray(light_norm, dtype=np.float64)
+        clear_nights = np.asarray(clear_nights, dtype=np.float64).reshape(len(light_norm), n_months)
+        if dark_hours is None:
+            dark_hours = np.zeros_like(clear_nights)
+        dark_hours = np.nan_to_num(np.asarray(dark_hours, dtype=np.float64).reshape(len(light_norm), n_months))
+        countries = np.asarray(countries).astype(str)
+
+        # Zeilen nach Land sortieren (stabil, innerhalb eines Landes bleibt die Reihenfolge)
+        # Spalten: 0 Lichtverschmutzung_norm, 1-12 klare Nächte, 13-24 mondfreie Dunkelstunden
+        self.rows = np.argsort(countries, kind="stable")
+        self.features = np.empty((len(light_norm), 1 + 2 * n_months))
+        self.features[:, 0] = light_norm[self.rows]
+        self.features[:, 1:1 + n_months] = clear_nights[self.rows]
+        self.features[:, 1 + n_months:] = dark_hours[self.rows]
+
+        names, starts, counts = np.unique(countries[self.rows], return_index=True, return_counts=True)
+        self._blocks = {"Alle": slice(0, len(self.rows))}
+        for country, start, count in zip(names.tolist(), starts.tolist(), counts.tolist()):
+            self._blocks[country] = slice(start, start + count)
+
+    @classmethod
+    def from_frame(cls, df, month_columns=MONTH_KEYS, dark_hours=None):
+        """
+        Matrix aus der Ortstabelle (Spalten Lichtverschmutzung_norm, Land und die
+        Monatsspalten) und optional den Dunkelstunden (Orte x 12) in derselben Zeilenfolge
+        """
+        return cls(
+            df['Lichtverschmutzung_norm'].to_numpy(),
+            df[list(month_columns)].to_numpy(dtype=np.float64),
+            df['Land'].to_numpy(),
+            dark_hours
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def block(self, country):
+        """Zeilenbereich des Landes in der Matrix ("Alle" für alle Orte)"""
+        return self._blocks.get(country, slice(0, 0))
+
+    def scores(self, country, months, light_weight, clear_weight, dark_weight=0.0):
+        """
+        Astro-Score der Orte des Landes für die Monate (Indizes 0-11, leer = alle).
+
+        Gibt (Zeilen der Ortstabelle, Durchschnitt klarer Nächte, Klare_Nächte_norm,
+        Durchschnitt mondfreier Dunkelstunden, Dunkelstunden_norm, Astro_Score,
+        Astro_Score_10) in der Reihenfolge der Matrix zurück.
+        """
+        block = self.block(country)
+        months = np.asarray(list(months) or range(len(MONTH_KEYS)))
+
+        # Spalte 0: Lichtverschmutzung_norm, 1: klare Nächte, 2: Dunkelstunden (Mittel der Monate)
+        weights = np.zeros((self.features.shape[1], 3))
+        weights[0, 0] = 1.0
+        weights[1 + months, 1] = 1.0 / len(months)
+        weights[1 + len(MONTH_KEYS) + months, 2] = 1.0 / len(months)
+        light_norm, average, dark_average = (self.features @ weights).T
+
+        # Klare Nächte und Dunkelstunden wie Lichtverschmutzung_norm bezogen auf das Maximum
+        # über alle Orte ("Alle"), die Wahl eines Landes filtert die Rangfolge nur
+        clear_norm = _normalize(average)[block]
+        dark_norm = _normalize(dark_average)[block]
+        light_norm, average, dark_average = light_norm[block], average[block], dark_average[block]
+        astro_score = light_norm * light_weight + clear_norm * clear_weight + dark_norm * dark_weight
+        return self.rows[block], average, clear_norm, dark_average, dark_norm, astro_score, astro_score * 9 + 1
+
+
+def _normalize(values):
+    """Auf 0-1 bezogen auf das Maximum (nur Nullen, wenn das Maximum nicht positiv ist)"""
+    max_value = values.max() if len(values) else 0
+    return values / max_value if max_value > 0 else np.zeros_like(values)
@@ -0,0 +1,184 @@
+"""
+Dunkelheits- und Mondkalender für den Astrotourismus-Planer.
+
+Für jeden Ort und jede Nacht eines Zeitraums werden in einem Durchlauf
+berechnet: das Fenster der astronomischen Dunkelheit (Sonne tiefer als 18°
+unter dem Horizont), die Beleuchtung des Mondes und die Stunden, in denen es
+astronomisch dunkel ist und der Mond nicht stört.
+
+Sonnen- und Mondposition stammen aus einfachen Näherungsformeln (Genauigkeit
+im Bereich von Minuten bzw. ca. 1°, ohne Refraktion und Mondparallaxe) und
+hängen nur von der Zeit ab. Sie werden einmal pro Zeitraum als Ephemeriden-
+Tabelle (ein Eintrag alle EPHEMERIS_STEP_MINUTES) berechnet; die Höhen über
+dem Horizont ergeben sich daraus für alle Orte blockweise als Array-Operationen.
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+from datetime import date
+
+import numpy as np
+
+from astro_weather import MONTH_KEYS
+
+# Zeitauflösung der Ephemeriden-Tabelle
+EPHEMERIS_STEP_MINUTES = 10
+
+# Sonnenhöhe (Grad), unterhalb derer es astronomisch dunkel ist
+ASTRONOMICAL_TWILIGHT = -18.0
+
+# Ein Mond unterhalb dieser Beleuchtung (0-1) stört auch über dem Horizont nicht
+MOON_FREE_ILLUMINATION = 0.1
+
+# Betrachtetes Nachtfenster in Ortszeit (Sonnenzeit): 15 Uhr bis 9 Uhr am Folgetag
+NIGHT_START_HOUR = 15
+NIGHT_HOURS = 18
+
+# Orte pro Block (bestimmt den Speicherbedarf: Orte x Nächte x Zeitpunkte)
+SITE_BLOCK = 32
+
+_J2000 = np.datetime64("2000-01-01T12:00", "m")
+
+
+def ephemeris(start, n_days, step_minutes=EPHEMERIS_STEP_MINUTES):
+    """
+    Zeitabhängige Sonnen- und Mondgrößen von start - 1 Tag bis start + n_days + 1 Tag (UTC).
+
+    Gibt ein dict mit Arrays gleicher Länge zurück: "time" (datetime64, UTC),
+    "moon_illumination" (0-1) und je Körper ("sun", "moon") sin(Deklination)
+    sowie cos(Deklination) mal cos/sin des Stundenwinkels in Greenwich
+    ("_sin_dec", "_cos_ha", "_sin_ha"), aus denen sich die Höhe für jeden Ort
+    ohne weitere Winkelfunktionen der Zeit ergibt.
+    """
+    first = np.datetime64(start, "D") - np.timedelta64(1, "D")
+    n_steps = (n_days + 2) * 24 * 60 // step_minutes
+    time = first.astype("datetime64[m]") + np.arange(n_steps) * np.timedelta64(step_minutes, "m")
+    d = (time - _J2000).astype(np.float64) / (24 * 60)
+
+    # Sternzeit in Greenwich und Schiefe der Ekliptik (Grad)
+    gmst = 280.46061837 + 360.98564736629 * d
+    eps = np.radians(23.439 - 0.0000004 * d)
+
+    # Sonne: mittlere Länge und Anomalie, ekliptikale Länge
+    g = np.radians(357.528 + 0.9856003 * d)
+    sun_lon = np.radians(280.460 + 0.9856474 * d + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g))
+    sun_ra = np.arctan2(np.cos(eps) * np.sin(sun_lon), np.cos(sun_lon))
+    sun_dec = np.arcsin(np.sin(eps) * np.sin(sun_lon))
+
+    # Mond: mittlere Länge, Anomalie und Knotenabstand, Hauptterme der Störungen
+    moon_mean = 218.316 + 13.176396 * d
+    m = np.radians(134.963 + 13.064993 * d)
+    f = np.radians(93.272 + 13.229350 * d)
+    moon_lon = np.radians(moon_mean + 6.289 * np.sin(m))
+    moon_lat = np.radians(5.128 * np.sin(f))
+    moon_ra = np.arctan2(
+        np.sin(moon_lon) * np.cos(eps) - np.tan(moon_lat) * np.sin(eps),
+        np.cos(moon_lon)
+    )
+    moon_dec = np.arcsin(np.sin(moon_lat) * np.cos(eps) + np.cos(moon_lat) * np.sin(eps) * np.sin(moon_lon))
+
+    # Beleuchteter Anteil aus der Elongation zwischen Sonne und Mond
+    cos_elongation = (
+        np.sin(sun_dec) * np.sin(moon_dec)
+        + np.cos(sun_dec) * np.cos(moon_dec) * np.cos(sun_ra - moon_ra)
+    )
+
+    table = {"time": time, "moon_illumination": (1 - cos_elongation) / 2}
+    for body, ra, dec in (("sun", sun_ra, sun_dec), ("moon", moon_ra, moon_dec)):
+        hour_angle = np.radians(gmst) - ra
+        table[f"{body}_sin_dec"] = np.sin(dec)
+        table[f"{body}_cos_ha"] = np.cos(dec) * np.cos(hour_angle)
+        table[f"{body}_sin_ha"] = np.cos(dec) * np.sin(hour_angle)
+    return table
+
+
+def _sin_altitude(table, body, index, sin_lat, cos_lat, sin_lon, cos_lon):
+    """
+    Sinus der Höhe über dem Horizont für die Tabellenindizes (Orte x Nächte x Zeitpunkte):
+    sin(h) = sin(φ) sin(δ) + cos(φ) cos(δ) cos(H0 + λ)
+    """
+    cos_hour_angle = table[f"{body}_cos_ha"][index] * cos_lon - table[f"{body}_sin_ha"][index] * sin_lon
+    return sin_lat * table[f"{body}_sin_dec"][index] + cos_lat * cos_hour_angle
+
+
+def night_calendar(lat, lon, start, n_days, table=None):
+    """
+    Dunkelheit und Mond für jeden Ort und jede Nacht ab start (n_days Nächte).
+
+    table: Ergebnis von ephemeris(start, n_days) (wird sonst berechnet).
+    Gibt ein dict zurück mit "dates" (Datum des Abends), "moon_illumination"
+    (pro Nacht, um Mitternacht in Greenwich) und pro Ort x Nacht: "dark_hours",
+    "moon_free_hours" (Stunden) sowie "dusk"/"dawn" (Beginn und Ende der
+    astronomischen Dunkelheit in UTC, NaT ohne Dunkelheit).
+    """
+    lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+    lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+    if table is None:
+        table = ephemeris(start, n_days)
+
+    step = int((table["time"][1] - table["time"][0]).astype(int))
+    steps_per_day = 24 * 60 // step
+    samples = np.arange(NIGHT_HOURS * 60 // step)
+    step_hours = step / 60
+
+    # Index von 15 Uhr UTC jedes Abends (die Tabelle beginnt einen Tag vor start)
+    night_start = (1 + np.arange(n_days)) * steps_per_day + NIGHT_START_HOUR * 60 // step
+    sin_twilight = np.sin(np.radians(ASTRONOMICAL_TWILIGHT))
+
+    shape = (len(lat), n_days)
+    dark_hours = np.empty(shape)
+    moon_free_hours = np.empty(shape)
+    dusk = np.empty(shape, dtype="datetime64[m]")
+    dawn = np.empty(shape, dtype="datetime64[m]")
+
+    for first in range(0, len(lat), SITE_BLOCK):
+        block = slice(first, first + SITE_BLOCK)
+        block_lat = np.radians(lat[block])[:, None, None]
+        block_lon = np.radians(lon[block])[:, None, None]
+        angles = (np.sin(block_lat), np.cos(block_lat), np.sin(block_lon), np.cos(block_lon))
+
+        # Ortszeit 15 Uhr liegt um Längengrad/15 Stunden vor 15 Uhr UTC
+        shift = np.rint(lon[block] / 15 * 60 / step).astype(np.int64)
+        index = night_start[None, :, None] - shift[:, None, None] + samples[None, None, :]
+
+        dark = _sin_altitude(table, "sun", index, *angles) < sin_twilight
+        moon_up = _sin_altitude(table, "moon", index, *angles) > 0
+        moon_bright = table["moon_illumination"][index] >= MOON_FREE_ILLUMINATION
+        moon_free = dark & ~(moon_up & moon_bright)
+
+        dark_hours[block] = dark.sum(axis=2) * step_hours
+        moon_free_hours[block] = moon_free.sum(axis=2) * step_hours
+
+        has_dark = dark.any(axis=2)
+        first_dark = np.take_along_axis(index, dark.argmax(axis=2)[..., None], axis=2)[..., 0]
+        last_dark = np.take_along_axis(index, (len(samples) - 1 - dark[..., ::-1].argmax(axis=2))[..., None], axis=2)[..., 0]
+        dusk[block] = np.where(has_dark, table["time"][first_dark], np.datetime64("NaT"))
+        dawn[block] = np.where(has_dark, table["time"][last_dark], np.datetime64("NaT"))
+
+    midnight = night_start + (24 - NIGHT_START_HOUR) * 60 // step
+    return {
+        "dates": np.datetime64(start, "D") + np.arange(n_days),
+        "moon_illumination": table["moon_illumination"][midnight],
+        "dark_hours": dark_hours,
+        "moon_free_hours": moon_free_hours,
+        "dusk": dusk,
+        "dawn": dawn
+    }
+
+
+def monthly_means(dates, values):
+    """
+    Mittelwert pro Kalendermonat (Orte x 12, Spalten wie MONTH_KEYS) der Werte pro Ort x Nacht.
+    Monate ohne Nächte im Zeitraum ergeben NaN.
+    """
+    months = (dates.astype("datetime64[M]").astype(np.int64) % 12)
+    sums = np.zeros((values.shape[0], len(MONTH_KEYS)))
+    counts = np.bincount(months, minlength=len(MONTH_KEYS))
+    for month in np.flatnonzero(counts):
+        sums[:, month] = values[:, months == month].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def upcoming_year(today=None):
+    """Zeitraum (Beginn, Anzahl Nächte) der kommenden 365 Nächte ab heute"""
+    return (today or date.today()), 365
@@ -0,0 +1,406 @@
+"""
+Historische Wetterdaten (Visual Crossing) für den Astrotourismus-Planer.
+
+Die stündlichen Daten werden inkrementell eingelesen: pro Ort werden nur die
+abgeschlossenen Monate abgerufen, die noch nicht gespeichert sind, gebündelt
+zu Zeitraum-Anfragen von höchstens CHUNK_MONTHS Monaten. Die Antwort wird
+gestreamt Tag für Tag dekodiert und sofort auf die Nächte (Sonnenuntergang
+eines Tages bis Sonnenaufgang des folgenden) reduziert, pro (Ort, Jahr, Monat)
+in SQLite aggregiert; die Stundenwerte selbst werden nicht gespeichert. Eine
+Aktualisierung lädt damit nur die seit dem letzten Abruf hinzugekommenen Monate.
+
+Die Anfragen laufen parallel über eine gemeinsame Session mit
+Verbindungspool, Timeouts und Wiederholungen.
+
+Ohne Streamlit-Aufrufe, damit das Modul auch außerhalb der App nutzbar ist.
+"""
+import calendar
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from astro_geocode import DEFAULT_CACHE_DIR
+from launch_store import JsonStreamReader
+
+TIMELINE_URL = "https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline"
+
+# Spaltennamen der Monate wie in den Tabellen der App
+MONTH_KEYS = ["Jan", "Feb", "Mar", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
+
+# Weniger als 30% Wolkendecke gilt als klar (pro Nachtstunde und im Mittel einer Nacht)
+CLEAR_CLOUD_COVER = 30
+
+# Höchstens so viele Monate pro Anfrage (stündliche Daten, ca. 730 Stunden pro Monat)
+CHUNK_MONTHS = 6
+
+# Ein Monat gilt als vollständig abgerufen, wenn höchstens so viele Nächte fehlen
+MAX_MISSING_NIGHTS = 1
+
+# Ohne Sonnenauf-/-untergang im Datensatz beginnt die Nacht um 21 Uhr und endet um 6 Uhr
+FALLBACK_NIGHT_START = 21
+FALLBACK_NIGHT_END = 6
+
+
+def site_key(lat, lon):
+    """Schlüssel eines Ortes (auf ca. 10 m gerundet)"""
+    return f"{lat:.4f},{lon:.4f}"
+
+
+def history_years(n_years=3, today=None):
+    """Die letzten n_years abgeschlossenen Kalenderjahre"""
+    current_year = (today or date.today()).year
+    return [current_year - offset for offset in range(1, n_years + 1)]
+
+
+def recent_months(n_months=36, today=None):
+    """Die letzten n_months abgeschlossenen Monate als [(Jahr, Monat), ...], älteste zuerst"""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1
+    return [(i // 12, i % 12 + 1) for i in range(index - n_months, index)]
+
+
+def year_months(years):
+    """Alle Monate der Jahre als [(Jahr, Monat), ...]"""
+    return [(year, month) for year in sorted(years) for month in range(1, 13)]
+
+
+def month_chunks(months, size=CHUNK_MONTHS):
+    """
+    Fasst sortierte (Jahr, Monat) zu zusammenhängenden Abschnitten von höchstens size Monaten zusammen
+    """
+    chunks = []
+    for year, month in sorted(months):
+        if chunks and len(chunks[-1]) < size:
+            last_year, last_month = chunks[-1][-1]
+            if (year * 12 + month) - (last_year * 12 + last_month) == 1:
+                chunks[-1].append((year, month))
+                continue
+        chunks.append([(year, month)])
+    return chunks
+
+
+def _dark_hours(day):
+    """
+    Wolkendecke der Stunden eines Tages vor Sonnenaufgang und ab Sonnenuntergang
+    als (Morgen, Abend); fehlende Werte gelten als bewölkt
+    """
+    sunrise = day.get("sunriseEpoch")
+    sunset = day.get("sunsetEpoch")
+    morning = []
+    evening = []
+    for hour in day.get("hours") or []:
+        if sunrise is not None and sunset is not None and "datetimeEpoch" in hour:
+            is_morning = hour["datetimeEpoch"] < sunrise
+            is_evening = hour["datetimeEpoch"] >= sunset
+        else:
+            is_morning = int(hour["datetime"][:2]) < FALLBACK_NIGHT_END
+            is_evening = int(hour["datetime"][:2]) >= FALLBACK_NIGHT_START
+        if is_morning or is_evening:
+            value = hour.get("cloudcover")
+            (morning if is_morning else evening).append(100 if value is None else value)
+    return morning, evening
+
+
+def aggregate_nights(days):
+    """
+    Aggregiert die Stundenwerte der Timeline-API auf die Nächte je Monat.
+
+    days: Tage in zeitlicher Reihenfolge (auch als Iterator, siehe iter_days).
+    Eine Nacht reicht vom Sonnenuntergang eines Tages bis zum Sonnenaufgang des
+    folgenden und zählt zum Monat ihres Abends; sie gilt als klar, wenn ihre
+    mittlere Wolkendecke unter CLEAR_CLOUD_COVER liegt. Der Abend des letzten
+    Tages ist unvollständig und wird verworfen. Gibt {(Jahr, Monat): {"nights",
+    "clear_nights", "night_hours", "clear_hours"}} für alle Monate zurück, zu
+    denen Tage vorliegen.
+    """
+    months = {}
+    previous_day = None
+    evening = None
+    for day in days:
+        current_day = date.fromisoformat(day["datetime"][:10])
+        morning, next_evening = _dark_hours(day)
+
+        # Der Morgen dieses Tages beschließt die Nacht, die am Vortag begann
+        if previous_day is not None and current_day - previous_day == timedelta(days=1):
+            cloud_cover = evening + morning
+            if cloud_cover:
+                totals = months[(previous_day.year, previous_day.month)]
+                totals["nights"] += 1
+                totals["clear_nights"] += sum(cloud_cover) / len(cloud_cover) < CLEAR_CLOUD_COVER
+                totals["night_hours"] += len(cloud_cover)
+                totals["clear_hours"] += sum(value < CLEAR_CLOUD_COVER for value in cloud_cover)
+
+        months.setdefault(
+            (current_day.year, current_day.month),
+            {"nights": 0, "clear_nights": 0, "night_hours": 0, "clear_hours": 0}
+        )
+        previous_day = current_day
+        evening = next_evening
+    return months
+
+
+def iter_days(chunks):
+    """
+    Dekodiert eine Antwort der Timeline-API gestreamt und liefert die Tage aus
+    "days" einzeln, ohne die ganze Antwort im Speicher zu halten
+    """
+    reader = JsonStreamReader(chunks)
+    reader.expect("{")
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key == "days":
+            reader.expect("[")
+            while reader.peek() != "]":
+                yield reader.value()
+                if reader.peek() == ",":
+                    reader.pos += 1
+            reader.pos += 1
+        else:
+            reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+
+
+def average_months(per_year):
+    """
+    Mittelt {Jahr: {Monat: Anzahl}} zu {"Jan": ..., "Feb": ..., ...} (None ohne Jahre)
+    """
+    if not per_year:
+        return None
+    return {
+        MONTH_KEYS[month - 1]: round(sum(months.get(month, 0) for months in per_year.values()) / len(per_year))
+        for month in range(1, 13)
+    }
+
+
+def average_aggregates(per_month):
+    """
+    Mittelt {(Jahr, Monat): Aggregat} je Kalendermonat zu {"Jan": {"clear_nights": ...,
+    "clear_hour_share": ...}, ...} (None ohne Daten). Monate ohne Daten fehlen.
+    """
+    if not per_month:
+        return None
+    result = {}
+    for month in range(1, 13):
+        rows = [row for (_, m), row in per_month.items() if m == month]
+        if not rows:
+            continue
+        night_hours = sum(row["night_hours"] for row in rows)
+        result[MONTH_KEYS[month - 1]] = {
+            "clear_nights": round(sum(row["clear_nights"] for row in rows) / len(rows)),
+            "clear_hour_share": sum(row["clear_hours"] for row in rows) / night_hours if night_hours else 0.0
+        }
+    return result
+
+
+def _is_complete(year, month, today=None):
+    """True, wenn der Monat vollständig in der Vergangenheit liegt"""
+    today = today or date.today()
+    return (year, month) < (today.year, today.month)
+
+
+class ClearNightsHistory:
+    """
+    Nacht-Aggregate (klare Nächte und Nachtstunden) pro Ort und Monat mit
+    persistentem Cache. Eine Instanz kann von mehreren Sitzungen gleichzeitig
+    genutzt werden; Fehler werden pro Aufruf zurückgegeben.
+
+    max_workers begrenzt die gleichzeitigen Anfragen (und die Größe des
+    Verbindungspools); fehlgeschlagene Anfragen werden mit Backoff wiederholt.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        cache_dir=DEFAULT_CACHE_DIR,
+        max_workers=4,
+        timeout=(5, 30),
+        retries=3,
+        session=None
+    ):
+        self.api_key = api_key
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = session or self._create_session(max_workers, retries)
+
+        self._lock = threading.Lock()
+        self._db = self._connect()
+
+    @property
+    def db_path(self):
+        return os.path.join(self.cache_dir, "weather.sqlite")
+
+    def monthly_aggregates(self, sites, months):
+        """
+        Nacht-Aggregate für jeden Ort und jeden der abgeschlossenen Monate.
+
+        sites: Liste von (lat, lon), months: Liste von (Jahr, Monat). Gibt
+        ({site_key: {(Jahr, Monat): Aggregat}}, Fehlermeldungen) zurück (siehe
+        aggregate_nights); nur fehlende Monate werden abgerufen.
+        """
+        errors = []
+        months = sorted({(year, month) for year, month in months if _is_complete(year, month)})
+        keys = [site_key(lat, lon) for lat, lon in sites]
+        result = self._load(keys, months)
+
+        jobs = []
+        seen = set()
+        for key, (lat, lon) in zip(keys, sites):
+            if key in seen:
+                continue
+            seen.add(key)
+            missing = [month for month in months if month not in result.setdefault(key, {})]
+            jobs.extend((key, lat, lon, chunk) for chunk in month_chunks(missing))
+
+        if jobs:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                fetched = list(executor.map(lambda job: self._fetch_chunk(*job, errors), jobs))
+            for (key, _, _, _), aggregates in zip(jobs, fetched):
+                result[key].update(aggregates or {})
+        return result, errors
+
+    def monthly_clear_nights(self, sites, years):
+        """
+        Anzahl klarer Nächte für jeden Ort und jedes Jahr.
+
+        sites: Liste von (lat, lon). Gibt ({site_key: {Jahr: {Monat (1-12): Anzahl}}},
+        Fehlermeldungen) zurück; Jahre, die nicht vollständig abgerufen werden konnten, fehlen.
+        """
+        aggregates, errors = self.monthly_aggregates(sites, year_months(years))
+        result = {}
+        for key, per_month in aggregates.items():
+            result[key] = {}
+            for year in years:
+                months = {month: per_month[(year, month)]["clear_nights"] for month in range(1, 13) if (year, month) in per_month}
+                if len(months) == 12:
+                    result[key][year] = months
+        return result, errors
+
+    def _fetch_chunk(self, key, lat, lon, months, errors):
+        """
+        Eine Zeitraum-Anfrage mit Stundenwerten für zusammenhängende Monate; speichert die Aggregate.
+        Der Zeitraum endet einen Tag nach dem letzten Monat, damit auch dessen letzte Nacht
+        bis zum Sonnenaufgang vollständig ist (der Morgen des ersten Tages gehört zum
+        vorherigen Abschnitt). Monate, zu denen die API nicht fast alle Nächte geliefert
+        hat, werden nicht gespeichert und beim nächsten Aufruf erneut abgerufen.
+        Fehler werden an errors angehängt.
+        """
+        (first_year, first_month), (last_year, last_month) = months[0], months[-1]
+        first_day = date(first_year, first_month, 1)
+        end_day = date(last_year, last_month, calendar.monthrange(last_year, last_month)[1]) + timedelta(days=1)
+        url = f"{TIMELINE_URL}/{lat},{lon}/{first_day.isoformat()}/{end_day.isoformat()}"
+        params = {
+            "unitGroup": "metric",
+            "include": "days,hours",
+            "elements": "datetime,datetimeEpoch,cloudcover,sunriseEpoch,sunsetEpoch",
+            "key": self.api_key,
+            "contentType": "json"
+        }
+        label = f"{key} ({first_year}-{first_month:02d} bis {last_year}-{last_month:02d})"
+        try:
+            with self.session.get(url, params=params, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                aggregates = aggregate_nights(iter_days(response.iter_content(chunk_size=64 * 1024)))
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            with self._lock:
+                errors.append(f"Fehler beim Abrufen der Wetterdaten für {label}: {str(e)}")
+            return None
+
+        complete = {
+            (year, month): aggregates[(year, month)] for year, month in months
+            if (year, month) in aggregates
+            and aggregates[(year, month)]["nights"] >= calendar.monthrange(year, month)[1] - MAX_MISSING_NIGHTS
+        }
+        incomplete = [f"{year}-{month:02d}" for year, month in months if (year, month) not in complete]
+        if incomplete:
+            with self._lock:
+                errors.append(f"Unvollständige Wetterdaten für {key} ({', '.join(incomplete)}), wird erneut abgerufen")
+        self._store(key, complete, label, errors)
+        return complete
+
+    @staticmethod
+    def _create_session(max_workers, retries):
+        session = requests.Session()
+        retry = Retry(
+            total=retries,
+            connect=1,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _connect(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._create_table(db)
+        except (OSError, sqlite3.Error):
+            # Ohne schreibbares Verzeichnis bleibt der Cache nur im Speicher
+            db = sqlite3.connect(":memory:", check_same_thread=False)
+            self._create_table(db)
+        return db
+
+    @staticmethod
+    def _create_table(db):
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS night_aggregates ("
+            "site TEXT, year INTEGER, month INTEGER, nights INTEGER, clear_nights INTEGER, "
+            "night_hours INTEGER, clear_hours INTEGER, fetched_at REAL, "
+            "PRIMARY KEY (site, year, month))"
+        )
+        db.commit()
+
+    def _load(self, keys, months):
+        """Gespeicherte Aggregate als {site_key: {(Jahr, Monat): Aggregat}}"""
+        cached = {}
+        if not keys or not months:
+            return cached
+        years = sorted({year for year, _ in months})
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT site, year, month, nights, clear_nights, night_hours, clear_hours FROM night_aggregates "
+                f"WHERE year IN ({','.join('?' * len(years))})",
+                years
+            ).fetchall()
+        wanted = set(keys)
+        wanted_months = set(months)
+        for key, year, month, nights, clear_nights, night_hours, clear_hours in rows:
+            if key in wanted and (year, month) in wanted_months:
+                cached.setdefault(key, {})[(year, month)] = {
+                    "nights": nights,
+                    "clear_nights": clear_nights,
+                    "night_hours": night_hours,
+                    "clear_hours": clear_hours
+                }
+        return cached
+
+    def _store(self, key, aggregates, label, errors):
+        if not aggregates:
+            return
+        now = time.time()
+        try:
+            with self._lock, self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO night_aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (key, year, month, row["nights"], row["clear_nights"], row["night_hours"], row["clear_hours"], now)
+                        for (year, month), row in aggregates.items()
+                    ]
+                )
+        except sqlite3.Error as e:
+            with self._lock:
+                errors.append(f"Fehler beim Speichern der Wetterdaten für {label}: {str(e)}")
@@ -0,0 +1,234 @@
+"""
+Benchmarks für die Rechenpfade der Raketenstarts-App.
+
+Läuft ohne Streamlit und ohne Netzwerk gegen eine aufgezeichnete Seite der
+Launch-Library-API (fixtures/upcoming_launches.json). Für 20, 200 und 2000
+Starts wird die Fixture vervielfältigt (eindeutige IDs, versetzte Startzeiten).
+
+Gemessen werden Laufzeit (bester von --repeat Durchläufen), Kosten pro Start
+und Spitzenspeicher (tracemalloc, separater Durchlauf). Die Ergebnisse werden
+als JSON unter results/<label>.json gespeichert und können mit --compare
+gegen einen früheren Stand verglichen werden.
+
+Aufruf (aus dem Repository-Verzeichnis):
+    python benchmarks/benchmark_rocketstarts.py
+    python benchmarks/benchmark_rocketstarts.py --quick
+    python benchmarks/benchmark_rocketstarts.py --compare benchmarks/results/<label>.json
+    python benchmarks/benchmark_rocketstarts.py --record    # Fixture neu von der API aufzeichnen
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import requests
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from launch_store import UPCOMING_URL, decode_launch_page  # noqa: E402
+from rocket_launches import build_launch_table, build_orbit_table, parse_launch  # noqa: E402
+from rocket_visibility import _ground_track, calculate_orbit_path, calculate_rocket_visibility  # noqa: E402
+
+FIXTURE_PATH = os.path.join(BENCHMARK_DIR, "fixtures", "upcoming_launches.json")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+LAUNCH_COUNTS = [20, 200, 2000]
+ORBIT_COUNTS = [5, 10, 20, 50]
+# Genug Tage, damit auch 50 LEO-Umrundungen vollständig berechnet werden
+VISIBILITY_DAYS = 7
+
+
+def record_fixture(path=FIXTURE_PATH, limit=100):
+    """
+    Zeichnet eine Seite bevorstehender Starts von der Launch-Library-API auf
+    """
+    response = requests.get(UPCOMING_URL, params={"mode": "normal", "limit": limit}, timeout=30)
+    response.raise_for_status()
+    with open(path, "wb") as f:
+        f.write(response.content)
+    return len(response.json()["results"])
+
+
+def scaled_page(fixture, n_launches):
+    """
+    Vervielfältigt die Starts der Fixture auf n_launches (als JSON-Bytes einer API-Seite)
+    """
+    base = fixture["results"]
+    results = []
+    for i in range(n_launches):
+        launch = dict(base[i % len(base)])
+        copy = i // len(base)
+        if copy:
+            launch["id"] = f"{launch['id']}-{copy}"
+            if launch.get("net"):
+                net = datetime.fromisoformat(launch["net"].replace("Z", "+00:00")) + timedelta(hours=7 * copy)
+                launch["net"] = net.strftime("%Y-%m-%dT%H:%M:%SZ")
+        results.append(launch)
+    return json.dumps({"count": n_launches, "next": None, "previous": None, "results": results}).encode("utf-8")
+
+
+def measure(func, repeat):
+    """
+    Beste Laufzeit aus repeat Durchläufen und Spitzenspeicher eines weiteren Durchlaufs (MB)
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak / 1e6
+
+
+def benchmark_cases(page_bytes, orbit_counts):
+    """
+    Die gemessenen Rechenpfade als (Name, Orbits, Funktion) für eine Startliste
+    """
+    _, records = decode_launch_page([page_bytes[i:i + 65536] for i in range(0, len(page_bytes), 65536)])
+    launches = [launch for launch, _ in map(parse_launch, records) if launch is not None]
+    launch_table = build_launch_table(launches)
+    with_coords = launch_table[launch_table["latitude"].notna()]
+    specs = list(zip(
+        zip(with_coords["latitude"].tolist(), with_coords["longitude"].tolist()),
+        with_coords["utc_time"].dt.to_pydatetime().tolist(),
+        [description or mission_type for description, mission_type
+         in zip(with_coords["mission_description"], with_coords["mission_type"])]
+    ))
+
+    def decode():
+        decode_launch_page([page_bytes[i:i + 65536] for i in range(0, len(page_bytes), 65536)])
+
+    def parse():
+        # Verarbeitungsschleife aus main(): Starts aufbereiten und als Tabelle sortieren
+        build_launch_table([launch for launch, _ in map(parse_launch, records) if launch is not None])
+
+    def orbit_path():
+        _ground_track.cache_clear()
+        for coords, _, _ in specs:
+            calculate_orbit_path(coords)
+
+    yield "decode", None, decode
+    yield "parse", None, parse
+    yield "orbit_path", None, orbit_path
+
+    for orbits in orbit_counts:
+        def orbit_table(orbits=orbits):
+            build_orbit_table(launch_table, total_orbits=orbits, visibility_days=VISIBILITY_DAYS)
+
+        def visibility_per_launch(orbits=orbits):
+            for coords, launch_time, mission_type in specs:
+                calculate_rocket_visibility(coords, launch_time, mission_type, orbits, VISIBILITY_DAYS)
+
+        yield "orbit_table", orbits, orbit_table
+        yield "visibility_per_launch", orbits, visibility_per_launch
+
+
+def run_benchmarks(launch_counts, orbit_counts, repeat):
+    with open(FIXTURE_PATH, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    rows = []
+    for n_launches in launch_counts:
+        page_bytes = scaled_page(fixture, n_launches)
+        for name, orbits, func in benchmark_cases(page_bytes, orbit_counts):
+            # Große Listen nur einmal messen, damit der Lauf überschaubar bleibt
+            wall_s, peak_mb = measure(func, repeat if n_launches < 2000 else 1)
+            rows.append({
+                "case": name,
+                "launches": n_launches,
+                "orbits": orbits,
+                "wall_s": round(wall_s, 5),
+                "per_launch_ms": round(wall_s / n_launches * 1000, 4),
+                "peak_mb": round(peak_mb, 2)
+            })
+            print(f"{name:<22} {n_launches:>5} Starts {orbits or '-':>3} Orbits  {wall_s:8.4f} s  {peak_mb:8.2f} MB", flush=True)
+    return rows
+
+
+def default_label():
+    """
+    Kurzer Git-Hash des aktuellen Stands (oder Zeitstempel ohne Git)
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def save_results(rows, label):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "label": label,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": rows
+        }, f, indent=2)
+    return path
+
+
+def compare_results(rows, previous_path):
+    """
+    Tabelle mit Laufzeit und Speicher im Vergleich zu einem früheren Ergebnis
+    """
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    keys = ["case", "launches", "orbits"]
+    current = pd.DataFrame(rows).fillna({"orbits": 0})
+    before = pd.DataFrame(previous["results"]).fillna({"orbits": 0})
+    merged = current.merge(before, on=keys, suffixes=("", "_before"))
+    merged["wall_ratio"] = (merged["wall_s"] / merged["wall_s_before"]).round(2)
+    merged["peak_ratio"] = (merged["peak_mb"] / merged["peak_mb_before"]).round(2)
+    print(f"\nVergleich mit {previous['label']} (Verhältnis > 1 = langsamer bzw. mehr Speicher):")
+    print(merged[keys + ["wall_s_before", "wall_s", "wall_ratio", "peak_mb_before", "peak_mb", "peak_ratio"]].to_string(index=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks für die Raketenstarts-Berechnungen")
+    parser.add_argument("--quick", action="store_true", help="Nur 20 und 200 Starts mit 5 und 20 Orbits")
+    parser.add_argument("--repeat", type=int, default=3, help="Durchläufe pro Messung (Minimum zählt)")
+    parser.add_argument("--label", default=None, help="Name der Ergebnisdatei (Standard: Git-Hash)")
+    parser.add_argument("--compare", default=None, help="Früheres Ergebnis (JSON) zum Vergleich")
+    parser.add_argument("--no-save", action="store_true", help="Ergebnisse nicht speichern")
+    parser.add_argument("--record", action="store_true", help="Fixture von der API neu aufzeichnen und beenden")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"{record_fixture()} Starts nach {FIXTURE_PATH} aufgezeichnet")
+        return
+
+    launch_counts = LAUNCH_COUNTS[:2] if args.quick else LAUNCH_COUNTS
+    orbit_counts = [5, 20] if args.quick else ORBIT_COUNTS
+    rows = run_benchmarks(launch_counts, orbit_counts, args.repeat)
+
+    if not args.no_save:
+        print(f"\nErgebnisse gespeichert: {save_results(rows, args.label or default_label())}")
+    if args.compare:
+        compare_results(rows, args.compare)
+
+
+if __name__ == "__main__":
+    main()
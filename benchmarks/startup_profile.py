@@ -0,0 +1,237 @@
+"""
+Startprofil der Astrotourismus-App (Kaltstart).
+
+Misst jeweils in einem frischen Python-Prozess:
+
+- Importzeit pro Modul (python -X importtime, kumulativ inklusive aller
+  Abhängigkeiten, die das Modul als erstes lädt)
+- erste Darstellung pro Ansicht über streamlit.testing (AppTest): Laufzeit des
+  ersten Skriptdurchlaufs (Startansicht "Karte") und des Wechsels in die
+  Ansicht, dazu die schweren Bibliotheken, die dabei geladen wurden
+
+Läuft ohne Netzwerk mit den Daten aus data/ (Orte aus dem Ortsverzeichnis,
+Klimatologie, ohne API-Schlüssel). Die Ergebnisse werden als JSON unter
+results/startup-<label>.json gespeichert und können mit --compare gegen einen
+früheren Stand verglichen werden.
+
+Aufruf (aus dem Repository-Verzeichnis):
+    python benchmarks/startup_profile.py
+    python benchmarks/startup_profile.py --compare benchmarks/results/startup-<label>.json
+    git show <commit>:Astrotourism > /tmp/app_alt && python benchmarks/startup_profile.py --app /tmp/app_alt --label alt
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+APP_PATH = os.path.join(REPO_DIR, "Astrotourism")
+
+# Module der App, deren Importzeit einzeln gemessen wird
+IMPORT_MODULES = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "requests",
+    "astro_climatology",
+    "astro_geocode",
+    "astro_grid",
+    "astro_raster",
+    "astro_route",
+    "astro_score",
+    "astro_sky",
+    "astro_weather",
+    "astro_map",
+    "folium",
+    "branca",
+    "pydeck",
+    "matplotlib.pyplot"
+]
+
+# Bibliotheken, deren Laden pro Ansicht protokolliert wird
+HEAVY_MODULES = ["folium", "branca", "jinja2", "pydeck", "matplotlib"]
+
+VIEWS = ["🗺️ Karte", "📊 Vergleich", "📝 Details", "🌌 Dunkle Orte", "🧭 Tourenplaner"]
+
+
+def import_time(module):
+    """
+    Kumulative Importzeit (s) eines Moduls in einem frischen Interpreter (None, wenn nicht installiert)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    for line in reversed(result.stderr.splitlines()):
+        # "import time:  self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    return None
+
+
+def render_view(view_index, app_path=APP_PATH):
+    """
+    Kindprozess: erster Durchlauf der App und Wechsel in die Ansicht, als JSON auf stdout
+    """
+    import time
+
+    sys.path.insert(0, REPO_DIR)
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest erwartet eine Datei mit .py-Endung
+    script_dir = tempfile.mkdtemp()
+    script = os.path.join(script_dir, "astrotourism_app.py")
+    shutil.copy(app_path, script)
+
+    def loaded():
+        return {name for name in HEAVY_MODULES if name in sys.modules}
+
+    before = loaded()
+    app = AppTest.from_file(script, default_timeout=300)
+    start = time.perf_counter()
+    app.run()
+    first_run_s = time.perf_counter() - start
+    after_first = loaded()
+
+    switch_s = 0.0
+    # Ältere Stände ohne Ansichtsauswahl (st.tabs) stellen alle Ansichten im ersten Durchlauf dar
+    selector = next((radio for radio in app.radio if radio.label == "Ansicht"), None)
+    if view_index > 0 and selector is not None:
+        selector.set_value(VIEWS[view_index])
+        start = time.perf_counter()
+        app.run()
+        switch_s = time.perf_counter() - start
+
+    shutil.rmtree(script_dir, ignore_errors=True)
+    print(json.dumps({
+        "view": VIEWS[view_index],
+        "first_run_s": round(first_run_s, 4),
+        "switch_s": round(switch_s, 4),
+        "exceptions": [str(exception.value) for exception in app.exception],
+        "loaded_first_run": sorted(after_first - before),
+        "loaded_on_switch": sorted(loaded() - after_first)
+    }))
+
+
+def render_profile(cache_dir, app_path=APP_PATH):
+    rows = []
+    for view_index, view in enumerate(VIEWS):
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--render-view", str(view_index), "--app", app_path],
+            cwd=REPO_DIR, capture_output=True, text=True,
+            env=dict(os.environ, ASTRO_CACHE_DIR=cache_dir)
+        )
+        if result.returncode != 0:
+            print(f"{view}: Fehler\n{result.stderr[-2000:]}", flush=True)
+            continue
+        row = json.loads(result.stdout.strip().splitlines()[-1])
+        rows.append(row)
+        print(
+            f"{view:<18} erster Durchlauf {row['first_run_s']:7.3f} s  Wechsel {row['switch_s']:7.3f} s  "
+            f"geladen: {', '.join(row['loaded_first_run'] + row['loaded_on_switch']) or '-'}",
+            flush=True
+        )
+    return rows
+
+
+def import_profile():
+    rows = []
+    for module in IMPORT_MODULES:
+        seconds = import_time(module)
+        rows.append({"module": module, "import_s": None if seconds is None else round(seconds, 4)})
+        print(f"{module:<20} {'nicht installiert' if seconds is None else f'{seconds:8.4f} s'}", flush=True)
+    return rows
+
+
+def default_label():
+    """
+    Kurzer Git-Hash des aktuellen Stands (oder Zeitstempel ohne Git)
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def save_results(imports, renders, label):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"startup-{label}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "label": label,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "imports": imports,
+            "renders": renders
+        }, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def compare_results(imports, renders, previous_path):
+    """
+    Vergleich der Ansichten (erster Durchlauf + Wechsel) mit einem früheren Ergebnis
+    """
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    before = {row["view"]: row for row in previous["renders"]}
+    print(f"\nVergleich mit {previous['label']} (Verhältnis > 1 = langsamer):")
+    for row in renders:
+        old = before.get(row["view"])
+        if old is None:
+            continue
+        total = row["first_run_s"] + row["switch_s"]
+        old_total = old["first_run_s"] + old["switch_s"]
+        print(f"{row['view']:<18} {old_total:7.3f} s -> {total:7.3f} s  ({total / old_total:.2f})")
+    before_imports = {row["module"]: row["import_s"] for row in previous["imports"]}
+    for row in imports:
+        old = before_imports.get(row["module"])
+        if old and row["import_s"]:
+            print(f"{row['module']:<20} {old:8.4f} s -> {row['import_s']:8.4f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startprofil (Importe und erste Darstellung) der Astrotourismus-App")
+    parser.add_argument("--app", default=APP_PATH, help="Zu messendes App-Skript (Standard: Astrotourism)")
+    parser.add_argument("--label", default=None, help="Name der Ergebnisdatei (Standard: Git-Hash)")
+    parser.add_argument("--compare", default=None, help="Früheres Ergebnis (JSON) zum Vergleich")
+    parser.add_argument("--no-save", action="store_true", help="Ergebnisse nicht speichern")
+    parser.add_argument("--render-view", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.render_view is not None:
+        render_view(args.render_view, os.path.abspath(args.app))
+        return
+
+    print("Importzeit pro Modul (frischer Interpreter, kumulativ):")
+    imports = import_profile()
+
+    print("\nErste Darstellung pro Ansicht (frischer Prozess):")
+    cache_dir = tempfile.mkdtemp()
+    try:
+        renders = render_profile(cache_dir, os.path.abspath(args.app))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if not args.no_save:
+        print(f"\nErgebnisse gespeichert: {save_results(imports, renders, args.label or default_label())}")
+    if args.compare:
+        compare_results(imports, renders, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Batch-Export der Sichtbarkeitsberechnung ohne Streamlit.
+
+Lädt die bevorstehenden Starts (über den gemeinsamen Snapshot von launch_store
+oder aus einer gespeicherten API-Seite), berechnet blockweise die Umrundungen
+und schreibt pro Start und Umrundung eine Zeile als NDJSON oder Parquet. Jeder
+Block wird geschrieben, sobald er berechnet ist, daher bleibt der Speicherbedarf
+unabhängig von der Anzahl der Starts.
+
+Aufruf (z.B. per cron):
+    python export_visibility.py -o sichtbarkeit.ndjson
+    python export_visibility.py -o sichtbarkeit.parquet --workers 4
+    python export_visibility.py --input benchmarks/fixtures/upcoming_launches.json -o -
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from launch_store import DEFAULT_CACHE_DIR, LaunchStore, decode_launch_page
+from rocket_launches import process_launch_chunk
+
+# Spalten der Exportdatei (Startdaten, dann die Umrundung)
+export_columns = [
+    "launch_id", "name", "rocket", "provider", "mission_type", "orbit_type", "pad", "location",
+    "launch_latitude", "launch_longitude", "launch_time_utc", "orbit_number", "time_utc", "time_de",
+    "visibility_date", "window_start", "window_end", "duration_minutes", "visibility_chance",
+    "visibility_text", "hinweis", "latitude", "longitude"
+]
+
+
+def load_launches(input_path=None, cache_dir=DEFAULT_CACHE_DIR, max_launches=100):
+    """
+    Starts als LaunchRecord-Liste aus einer gespeicherten API-Seite oder über den LaunchStore
+    """
+    if input_path:
+        with open(input_path, "rb") as f:
+            _, records = decode_launch_page(iter(lambda: f.read(64 * 1024), b""))
+        return records[:max_launches]
+
+    store = LaunchStore(cache_dir=cache_dir, max_launches=max_launches)
+    data = store.get(background=False)
+    if data is None:
+        raise RuntimeError(store.last_error or "Keine Startdaten verfügbar")
+    if store.last_error:
+        print(f"Warnung: {store.last_error} - verwende gespeicherte Daten", file=sys.stderr)
+    return data["results"]
+
+
+def iter_chunk_results(records, total_orbits=20, visibility_days=3, chunk_size=25, workers=1):
+    """
+    Liefert (Start-Tabelle, Orbit-Tabelle, Warnungen) pro Block in der Reihenfolge
+    der Starts. Mit workers > 1 rechnen mehrere Prozesse; es sind höchstens
+    2 * workers Blöcke gleichzeitig in Arbeit.
+    """
+    chunks = (records[i:i + chunk_size] for i in range(0, len(records), chunk_size))
+    if workers <= 1:
+        for chunk in chunks:
+            yield process_launch_chunk(chunk, total_orbits, visibility_days)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pending = []
+        for chunk in chunks:
+            pending.append(executor.submit(process_launch_chunk, chunk, total_orbits, visibility_days))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def export_rows(launch_table, orbit_table):
+    """
+    Eine Zeile pro Start und Umrundung mit den Exportspalten
+    """
+    # Orbit-Typ aus der Orbit-Tabelle (der für die Berechnung verwendete)
+    launches = launch_table.drop(columns="orbit_type").rename(columns={
+        "latitude": "launch_latitude",
+        "longitude": "launch_longitude",
+        "utc_time": "launch_time_utc"
+    })
+    launches["launch_time_utc"] = launches["launch_time_utc"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    rows = orbit_table.merge(launches, left_on="launch_id", right_index=True, how="inner", sort=False)
+    return rows[export_columns].reset_index(drop=True)
+
+
+class NdjsonWriter:
+    """
+    Schreibt Zeilen als Newline-Delimited JSON (Datei oder "-" für stdout)
+    """
+
+    def __init__(self, path):
+        self._file = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        for record in rows.to_dict(orient="records"):
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class ParquetWriter:
+    """
+    Schreibt Zeilen blockweise als Row-Groups in eine Parquet-Datei (benötigt pyarrow)
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Für den Parquet-Export wird pyarrow benötigt (pip install pyarrow)")
+        self._path = path
+        self._writer = None
+
+    def write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(rows, preserve_index=False)
+            self._writer = pq.ParquetWriter(self._path, table.schema)
+        else:
+            table = pa.Table.from_pandas(rows, schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is None:
+            # Auch ohne Zeilen eine gültige (leere) Datei schreiben
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            empty = pd.DataFrame({name: pd.Series(dtype=object) for name in export_columns})
+            pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), self._path)
+        else:
+            self._writer.close()
+
+
+def export_visibility(
+    records,
+    writer,
+    total_orbits=20,
+    visibility_days=3,
+    chunk_size=25,
+    workers=1
+):
+    """
+    Berechnet die Sichtbarkeit blockweise und schreibt jeden Block sofort.
+    Gibt (Anzahl Starts, Anzahl Zeilen, Warnungen) zurück.
+    """
+    n_launches = 0
+    n_rows = 0
+    warnings = []
+    seen = set()
+    for launch_table, orbit_table, chunk_warnings in iter_chunk_results(
+        records, total_orbits, visibility_days, chunk_size, workers
+    ):
+        warnings.extend(chunk_warnings)
+        # Starts aus früheren Blöcken (z.B. auf zwei API-Seiten) nur einmal exportieren,
+        # wie in process_launches_parallel gewinnt der erste Block
+        repeated = launch_table.index.isin(seen)
+        seen.update(launch_table.index)
+        orbit_table = orbit_table[~orbit_table["launch_id"].isin(launch_table.index[repeated])]
+        launch_table = launch_table[~repeated]
+        n_launches += len(launch_table)
+        rows = export_rows(launch_table, orbit_table)
+        if len(rows):
+            writer.write(rows)
+            n_rows += len(rows)
+    return n_launches, n_rows, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sichtbarkeit bevorstehender Raketenstarts exportieren")
+    parser.add_argument("-o", "--output", required=True, help="Ausgabedatei (.ndjson, .parquet oder - für stdout)")
+    parser.add_argument("--format", choices=["ndjson", "parquet"], default=None,
+                        help="Ausgabeformat (Standard: nach Dateiendung)")
+    parser.add_argument("--input", default=None, help="Gespeicherte API-Seite statt Abruf über den LaunchStore")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Verzeichnis des Launch-Snapshots")
+    parser.add_argument("--limit", type=int, default=100, help="Maximale Anzahl Starts")
+    parser.add_argument("--orbits", type=int, default=20, help="Anzahl der Umrundungen pro Start")
+    parser.add_argument("--days", type=int, default=3, help="Berechnungszeitraum in Tagen")
+    parser.add_argument("--chunk-size", type=int, default=25, help="Starts pro Block")
+    parser.add_argument("--workers", type=int, default=1, help="Anzahl paralleler Prozesse")
+    args = parser.parse_args()
+
+    output_format = args.format or ("parquet" if args.output.endswith(".parquet") else "ndjson")
+    if output_format == "parquet" and args.output == "-":
+        parser.error("Parquet kann nicht nach stdout geschrieben werden")
+
+    start = time.perf_counter()
+    try:
+        records = load_launches(args.input, args.cache_dir, args.limit)
+        writer = ParquetWriter(args.output) if output_format == "parquet" else NdjsonWriter(args.output)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        n_launches, n_rows, warnings = export_visibility(
+            records,
+            writer,
+            total_orbits=args.orbits,
+            visibility_days=args.days,
+            chunk_size=args.chunk_size,
+            workers=args.workers
+        )
+    finally:
+        writer.close()
+
+    for warning in warnings:
+        print(f"Warnung: {warning}", file=sys.stderr)
+    print(
+        f"{n_launches} Starts, {n_rows} Zeilen nach {args.output} geschrieben "
+        f"({time.perf_counter() - start:.1f} s)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
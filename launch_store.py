@@ -0,0 +1,394 @@
+"""
+Persistenter Zwischenspeicher für die Launch-Library-API.
+
+Die Startdaten werden seitenweise abgerufen, als Snapshot auf der Festplatte
+gespeichert und mit ETag/If-Modified-Since revalidiert. Veraltete Daten werden
+sofort ausgeliefert, während im Hintergrund aktualisiert wird. Schlägt die API
+fehl, bleibt der letzte gültige Snapshot erhalten.
+
+Die Antworten werden gestreamt dekodiert; von jedem Start bleiben nur die
+Felder übrig, die die App anzeigt (LaunchRecord).
+"""
+import codecs
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+import requests
+
+UPCOMING_URL = "https://ll.thespacedevs.com/2.2.0/launch/upcoming/"
+
+# Version des Snapshot-Formats (ältere Snapshots werden verworfen)
+SNAPSHOT_FORMAT = 2
+
+_json_decoder = json.JSONDecoder()
+
+
+def parse_retry_after(value):
+    """
+    Wartezeit in Sekunden aus einem Retry-After-Header (Sekunden oder HTTP-Datum);
+    None, wenn der Header fehlt oder ungültig ist
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LaunchRecord:
+    """
+    Kompakter Datensatz mit den Feldern eines Starts, die die App verwendet
+    """
+    __slots__ = (
+        "id", "name", "rocket_name", "provider", "mission_type", "mission_description",
+        "net", "pad_name", "location_name", "country_code", "latitude", "longitude"
+    )
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    @classmethod
+    def from_api(cls, launch):
+        """Extrahiert die Felder aus einem Start der Launch-Library-API"""
+        rocket = launch.get("rocket") or {}
+        mission = launch.get("mission") or {}
+        pad = launch.get("pad") or {}
+        location = pad.get("location") or {}
+        return cls(
+            launch.get("id"),
+            launch.get("name", "Unbekannt"),
+            (rocket.get("configuration") or {}).get("name", "Unbekannte Rakete"),
+            (launch.get("launch_service_provider") or {}).get("name", "Unbekannter Anbieter"),
+            mission.get("type", "Unbekannter Missionstyp"),
+            mission.get("description", ""),
+            launch.get("net", None),
+            pad.get("name", "Unbekannter Startplatz"),
+            location.get("name", "Unbekannter Ort"),
+            location.get("country_code", "??"),
+            pad.get("latitude"),
+            pad.get("longitude")
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    def to_row(self):
+        """Felder als Liste (für den Snapshot auf der Festplatte)"""
+        return [getattr(self, field) for field in self.__slots__]
+
+    def __getstate__(self):
+        return self.to_row()
+
+    def __setstate__(self, state):
+        for field, value in zip(self.__slots__, state):
+            setattr(self, field, value)
+
+    def __repr__(self):
+        return f"LaunchRecord({self.id!r}, {self.name!r}, net={self.net!r})"
+
+
+class JsonStreamReader:
+    """
+    Liest JSON-Text stückweise aus einem Iterator von Bytes-Blöcken
+    (auch von astro_weather für die Stundenwerte von Visual Crossing genutzt)
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._exhausted = False
+        self.text = ""
+        self.pos = 0
+
+    def fill(self):
+        """Lädt den nächsten Block nach; False, wenn keine Daten mehr kommen"""
+        if self._exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            chunk = self._decoder.decode(b"", final=True)
+        else:
+            chunk = self._decoder.decode(chunk)
+        # Bereits gelesenen Text verwerfen, damit der Puffer klein bleibt
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Nächstes Zeichen ohne Leerraum ("" am Ende der Daten)"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Ungültige API-Antwort: '{char}' erwartet")
+        self.pos += 1
+
+    def value(self):
+        """Dekodiert den nächsten vollständigen JSON-Wert"""
+        self.peek()
+        while True:
+            try:
+                value, end = _json_decoder.raw_decode(self.text, self.pos)
+            except ValueError:
+                if not self.fill():
+                    raise
+                continue
+            # Eine Zahl am Pufferende könnte noch weitergehen
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def decode_launch_page(chunks):
+    """
+    Dekodiert eine Seite der Launch-Library-API gestreamt.
+
+    Die Starts im "results"-Array werden einzeln gelesen und direkt in
+    LaunchRecord umgewandelt, die vollständigen Dictionaries werden nicht
+    gesammelt. Gibt (Metadaten, Datensätze) zurück.
+    """
+    reader = JsonStreamReader(chunks)
+    meta = {}
+    records = []
+
+    reader.expect("{")
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key == "results":
+            reader.expect("[")
+            while reader.peek() != "]":
+                records.append(LaunchRecord.from_api(reader.value()))
+                if reader.peek() == ",":
+                    reader.pos += 1
+            reader.pos += 1
+        else:
+            meta[key] = reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+    return meta, records
+
+# Standardverzeichnis für den Snapshot (per Umgebungsvariable änderbar)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ROCKETSTARTS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".launch_cache")
+)
+
+
+class LaunchStore:
+    """
+    Festplattenbasierter Cache für bevorstehende Raketenstarts mit
+    Paginierung, bedingten Anfragen und stale-while-revalidate.
+    """
+
+    def __init__(
+        self,
+        cache_dir=DEFAULT_CACHE_DIR,
+        base_url=UPCOMING_URL,
+        params=None,
+        max_launches=100,
+        page_size=50,
+        max_age=3600,
+        timeout=10,
+        session=None
+    ):
+        self.cache_dir = cache_dir
+        self.base_url = base_url
+        self.params = dict(params if params is not None else {"mode": "normal"})
+        self.max_launches = max_launches
+        self.page_size = page_size
+        self.max_age = max_age
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.last_error = None
+        # Vom Server verlangte Wartezeit (Retry-After bei 429/503) des letzten Abrufs
+        self.retry_after = None
+
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._snapshot = self._load_snapshot()
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.cache_dir, "upcoming.json")
+
+    @property
+    def fetched_at(self):
+        """Zeitpunkt (Unix-Zeit) des letzten erfolgreichen Abrufs oder None"""
+        return self._snapshot["fetched_at"] if self._snapshot else None
+
+    def is_stale(self, margin=0):
+        """
+        True ohne Snapshot oder wenn der Snapshot älter als max_age ist
+        (mit margin Sekunden schon entsprechend früher)
+        """
+        return self._snapshot is None or time.time() - self._snapshot["fetched_at"] > self.max_age - margin
+
+    def current(self):
+        """
+        Aktuelle Startdaten wie bei get(), aber ohne Abruf oder Aktualisierung (None ohne Snapshot)
+        """
+        return self._data()
+
+    def get(self, background=True):
+        """
+        Liefert die Startdaten als {"count": ..., "results": [LaunchRecord, ...]}.
+
+        Ohne Snapshot wird synchron abgerufen. Ein veralteter Snapshot wird
+        sofort zurückgegeben und (bei background=True) im Hintergrund erneuert.
+        Gibt None zurück, wenn weder API noch Snapshot Daten liefern.
+        """
+        if self._snapshot is None:
+            self.refresh()
+        elif self.is_stale():
+            if background:
+                self.refresh_in_background()
+            else:
+                self.refresh()
+        return self._data()
+
+    def refresh_in_background(self):
+        """Startet eine Aktualisierung in einem Hintergrund-Thread (falls keine läuft)"""
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self.refresh, daemon=True)
+            self._refresh_thread.start()
+
+    def refresh(self):
+        """
+        Ruft alle Seiten ab und speichert einen neuen Snapshot.
+        Bei Fehlern bleibt der bisherige Snapshot erhalten und last_error wird gesetzt.
+        Gibt True zurück, wenn die Aktualisierung erfolgreich war.
+        """
+        self.retry_after = None
+        try:
+            pages = self._fetch_pages()
+        except requests.exceptions.RequestException as e:
+            self.last_error = f"Verbindungsfehler: {str(e)}"
+            return False
+        except ValueError as e:
+            self.last_error = f"Fehler beim Abrufen der Daten: {str(e)}"
+            return False
+
+        snapshot = {
+            "format": SNAPSHOT_FORMAT,
+            "fetched_at": time.time(),
+            "base_url": self.base_url,
+            "params": self.params,
+            "pages": pages
+        }
+        self._save_snapshot(snapshot)
+        with self._lock:
+            self._snapshot = snapshot
+            self.last_error = None
+        return True
+
+    def _page_url(self, offset, limit):
+        return f"{self.base_url}?{urlencode({**self.params, 'limit': limit, 'offset': offset})}"
+
+    def _fetch_pages(self):
+        """
+        Ruft die Seiten nacheinander ab; unveränderte Seiten (304) werden aus
+        dem bisherigen Snapshot übernommen
+        """
+        previous_pages = {page["url"]: page for page in (self._snapshot or {}).get("pages", [])}
+        pages = []
+        offset = 0
+
+        while offset < self.max_launches:
+            limit = min(self.page_size, self.max_launches - offset)
+            url = self._page_url(offset, limit)
+            previous = previous_pages.get(url)
+
+            headers = {"Accept": "application/json"}
+            if previous:
+                if previous.get("etag"):
+                    headers["If-None-Match"] = previous["etag"]
+                if previous.get("last_modified"):
+                    headers["If-Modified-Since"] = previous["last_modified"]
+
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304 and previous:
+                    page = previous
+                elif response.status_code == 200:
+                    meta, records = decode_launch_page(response.iter_content(chunk_size=64 * 1024))
+                    page = {
+                        "url": url,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "count": meta.get("count"),
+                        "next": meta.get("next"),
+                        "results": records
+                    }
+                else:
+                    if response.status_code in (429, 503):
+                        self.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    raise ValueError(f"HTTP {response.status_code}")
+
+            pages.append(page)
+            if not page.get("next") or len(page["results"]) < limit:
+                break
+            offset += limit
+
+        return pages
+
+    def _data(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        results = [launch for page in snapshot["pages"] for launch in page["results"]]
+        count = snapshot["pages"][0].get("count") if snapshot["pages"] else 0
+        return {"count": count, "results": results[:self.max_launches]}
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or "pages" not in snapshot or "fetched_at" not in snapshot:
+            return None
+        # Snapshot einer anderen Abfrage oder eines älteren Formats nicht verwenden
+        if (snapshot.get("format") != SNAPSHOT_FORMAT or
+                snapshot.get("base_url") != self.base_url or
+                snapshot.get("params") != self.params):
+            return None
+        for page in snapshot["pages"]:
+            page["results"] = [LaunchRecord.from_row(row) for row in page["results"]]
+        return snapshot
+
+    def _save_snapshot(self, snapshot):
+        # Atomar schreiben, damit ein abgebrochener Schreibvorgang den letzten Snapshot nicht zerstört
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            stored = dict(snapshot, pages=[
+                dict(page, results=[record.to_row() for record in page["results"]])
+                for page in snapshot["pages"]
+            ])
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            # Ohne schreibbares Verzeichnis bleibt der Snapshot nur im Speicher
+            pass
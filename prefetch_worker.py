@@ -0,0 +1,191 @@
+"""
+Hintergrund-Worker für die Raketenstarts-App.
+
+Ein asyncio-Loop in einem eigenen Thread erneuert die Startdaten im LaunchStore
+kurz vor Ablauf und berechnet danach Start- und Orbit-Tabelle für die
+Standardeinstellungen vor. Das Ergebnis wird als Ganzes ausgetauscht, so dass
+alle Sitzungen entweder den alten oder den neuen Stand sehen und nie auf
+Netzwerk oder Orbitberechnung warten.
+
+Wie rocket_launches.py ohne Streamlit-Aufrufe.
+"""
+import asyncio
+import threading
+import time
+from collections import namedtuple
+
+from rocket_launches import build_launch_table, build_orbit_table, parse_launch
+
+# Vorberechneter Stand (wird nur als Ganzes ersetzt, nie verändert)
+PrecomputedLaunches = namedtuple(
+    "PrecomputedLaunches",
+    ["fetched_at", "total_orbits", "visibility_days", "launch_table", "orbit_table", "warnings"]
+)
+
+
+class PrefetchWorker:
+    """
+    Erneuert die Startdaten vor Ablauf und berechnet die Sichtbarkeit für
+    (total_orbits, visibility_days) im Hintergrund vor.
+
+    refresh_margin: so viele Sekunden vor Ablauf von store.max_age wird erneuert.
+    retry_interval: Wartezeit nach dem ersten fehlgeschlagenen Abruf; sie verdoppelt
+    sich mit jedem weiteren Fehlschlag bis höchstens store.max_age (eine vom Server
+    per Retry-After verlangte längere Wartezeit hat Vorrang).
+    """
+
+    def __init__(
+        self,
+        store,
+        total_orbits=20,
+        visibility_days=3,
+        orbit_cache=None,
+        refresh_margin=300,
+        retry_interval=60
+    ):
+        self.store = store
+        self.total_orbits = total_orbits
+        self.visibility_days = visibility_days
+        self.orbit_cache = orbit_cache
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.last_error = None
+
+        self._failures = 0
+        self._result = None
+        # Gesetzt nach dem ersten Durchlauf, auch wenn Abruf oder Berechnung fehlschlugen
+        self._first_cycle_done = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._wake = None
+        self._stopping = False
+
+    def start(self):
+        """Startet den Worker-Thread (einmalig)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=asyncio.run, args=(self._run(),), daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        self.trigger()
+
+    def trigger(self):
+        """Weckt den Worker sofort auf (z.B. nach einer manuellen Aktualisierung)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """
+        Wartet auf das Ende des ersten Durchlaufs (auch wenn er fehlschlug);
+        True, wenn ein Ergebnis vorliegt
+        """
+        self._first_cycle_done.wait(timeout)
+        return self._result is not None
+
+    def result(self, total_orbits=None, visibility_days=None):
+        """
+        Zuletzt vorberechneter Stand, falls er zu den Einstellungen passt, sonst None
+        """
+        result = self._result
+        if result is None:
+            return None
+        if total_orbits is not None and total_orbits != result.total_orbits:
+            return None
+        if visibility_days is not None and visibility_days != result.visibility_days:
+            return None
+        return result
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                delay = await self._cycle()
+            finally:
+                self._first_cycle_done.set()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _cycle(self):
+        """
+        Ein Durchlauf: ggf. erneuern, ggf. neu berechnen. Gibt die Wartezeit bis
+        zum nächsten Durchlauf in Sekunden zurück.
+        """
+        loop = asyncio.get_running_loop()
+        refreshed = True
+        try:
+            if self.store.is_stale(self.refresh_margin):
+                # Blockierende HTTP-Anfragen im Thread-Pool des Loops
+                refreshed = await loop.run_in_executor(None, self.store.refresh)
+                if self.store.current() is None:
+                    self.last_error = self.store.last_error
+                    return self._retry_delay()
+
+            result = self._result
+            if result is None or result.fetched_at != self.store.fetched_at:
+                await loop.run_in_executor(None, self._precompute)
+        except Exception as e:
+            # Der Worker darf nicht sterben; beim nächsten Durchlauf erneut versuchen
+            self.last_error = f"Fehler bei der Vorberechnung: {str(e)}"
+            return self._retry_delay()
+
+        if not refreshed:
+            # Alter Snapshot bleibt in Gebrauch, Abruf später erneut versuchen
+            self.last_error = self.store.last_error
+            return self._retry_delay()
+
+        self._failures = 0
+        self.last_error = None
+        age = time.time() - self.store.fetched_at
+        return max(self.retry_interval, self.store.max_age - self.refresh_margin - age)
+
+    def _retry_delay(self):
+        """
+        Wartezeit nach einem Fehlschlag: exponentiell wachsend, damit eine gestörte
+        oder drosselnde API (429) nicht jede Minute mit allen Seiten angefragt wird
+        """
+        delay = min(self.retry_interval * 2 ** self._failures, max(self.retry_interval, self.store.max_age))
+        self._failures += 1
+        return max(delay, self.store.retry_after or 0)
+
+    def _precompute(self):
+        fetched_at = self.store.fetched_at
+        data = self.store.current()
+        if data is None:
+            return
+
+        launches = []
+        warnings = []
+        for raw_launch in data["results"]:
+            launch, warning = parse_launch(raw_launch)
+            if warning:
+                warnings.append(warning)
+            if launch is not None:
+                launches.append(launch)
+
+        launch_table = build_launch_table(launches)
+        orbit_table, orbit_warnings = build_orbit_table(
+            launch_table,
+            total_orbits=self.total_orbits,
+            visibility_days=self.visibility_days,
+            cache=self.orbit_cache
+        )
+
+        # Atomarer Austausch: eine einzige Zuweisung des fertigen Stands
+        self._result = PrecomputedLaunches(
+            fetched_at,
+            self.total_orbits,
+            self.visibility_days,
+            launch_table,
+            orbit_table,
+            tuple(warnings + orbit_warnings)
+        )
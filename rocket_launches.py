@@ -0,0 +1,305 @@
+"""
+Aufbereitung der Launch-Library-Daten für die Raketenstarts-App.
+
+Wie rocket_visibility.py ohne Streamlit-Aufrufe, damit die Verarbeitung auch in
+Worker-Prozessen und außerhalb der App laufen kann. Warnungen werden als Text
+zurückgegeben und von der App angezeigt.
+"""
+import math
+import os
+from concurrent.futures import as_completed
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from launch_store import LaunchRecord
+from rocket_visibility import compute_orbit_table, orbit_columns, orbit_columns_to_records
+
+# Vereinfachte Zeitzonen-Liste
+timezones = {
+    "Deutschland": "Europe/Berlin",
+    "UTC": "UTC"
+}
+
+# Zeitraum-Filter der App
+time_range_limits = {
+    "Nächste 24 Stunden": timedelta(hours=24),
+    "Nächste 7 Tage": timedelta(days=7),
+    "Nächsten 30 Tage": timedelta(days=30)
+}
+
+# Spalten der Start-Tabelle (eine Zeile pro Start)
+launch_table_columns = [
+    "id", "name", "rocket", "provider", "mission_type", "mission_description", "pad",
+    "location", "latitude", "longitude", "start_utc", "start_de", "orbit_type", "utc_time"
+]
+
+
+def classify_orbit_type(mission_description):
+    """
+    Erkennt den Orbit-Typ aus der Missionsbeschreibung (Standard: LEO)
+    """
+    orbit_type = "LEO"  # Standard: Low Earth Orbit
+    if mission_description:
+        if "geostationär" in mission_description.lower() or "geostationary" in mission_description.lower() or "geo" in mission_description.lower():
+            orbit_type = "GEO"
+        elif "sonnensynchron" in mission_description.lower() or "sun-synchronous" in mission_description.lower() or "sso" in mission_description.lower():
+            orbit_type = "SSO"
+        elif "medium earth" in mission_description.lower() or "meo" in mission_description.lower():
+            orbit_type = "MEO"
+    return orbit_type
+
+
+def parse_launch(launch):
+    """
+    Bereitet einen Start (LaunchRecord oder Dictionary aus der API) für die App auf.
+
+    Gibt (Start-Dictionary, Warnung) zurück; das Dictionary ist None, wenn der
+    Start keine gültige Startzeit hat. Die Sichtbarkeit wird separat berechnet.
+    """
+    warning = None
+    if not isinstance(launch, LaunchRecord):
+        launch = LaunchRecord.from_api(launch)
+
+    name = launch.name
+    mission_type = launch.mission_type
+
+    # Mission-Beschreibung für bessere Orbit-Klassifizierung
+    mission_description = launch.mission_description
+
+    # Startzeit
+    launch_time_str = launch.net
+    if not launch_time_str:
+        return None, warning
+
+    try:
+        launch_time_utc = datetime.fromisoformat(launch_time_str.replace("Z", "+00:00"))
+    except ValueError:
+        return None, warning
+
+    # Koordinaten des Startorts
+    latitude = launch.latitude
+    longitude = launch.longitude
+
+    # Startzeiten in den vereinfachten Zeitzonen
+    launch_times = {}
+    for tz_name, tz_code in timezones.items():
+        timezone = pytz.timezone(tz_code)
+        local_time = launch_time_utc.astimezone(timezone)
+        launch_times[tz_name] = local_time.strftime("%d.%m.%Y, %H:%M:%S")
+
+    # Orbit-Typ aus Missionsbeschreibung erkennen
+    orbit_type = classify_orbit_type(mission_description)
+
+    # Koordinaten prüfen (falls vorhanden)
+    launch_site_coords = None
+    if latitude is not None and longitude is not None:
+        try:
+            launch_site_coords = (float(latitude), float(longitude))
+        except Exception as e:
+            warning = f"Fehler bei der Berechnung für {name}: {str(e)}"
+
+    return {
+        "id": launch.id or name,
+        "name": name,
+        "rocket": launch.rocket_name,
+        "provider": launch.provider,
+        "mission_type": mission_type,
+        "mission_description": mission_description,
+        "pad": launch.pad_name,
+        "location": f"{launch.location_name}, {launch.country_code}",
+        "latitude": launch_site_coords[0] if launch_site_coords else np.nan,
+        "longitude": launch_site_coords[1] if launch_site_coords else np.nan,
+        "start_utc": launch_times["UTC"],
+        "start_de": launch_times["Deutschland"],
+        "orbit_type": orbit_type,
+        "utc_time": launch_time_utc  # Für Sortierung
+    }, warning
+
+
+def build_launch_table(launches):
+    """
+    Flache Tabelle der aufbereiteten Starts (eine Zeile pro Start, Index: Start-ID),
+    nach Startzeit sortiert
+    """
+    table = pd.DataFrame.from_records(launches, columns=launch_table_columns)
+    table["utc_time"] = pd.to_datetime(table["utc_time"], utc=True)
+    # Start-IDs eindeutig halten (Fallback-ID ist der Name)
+    duplicated = table["id"].duplicated()
+    if duplicated.any():
+        table.loc[duplicated, "id"] = table.loc[duplicated, "id"] + "#" + table.groupby("id").cumcount()[duplicated].astype(str)
+    return table.set_index("id").sort_values("utc_time", kind="stable")
+
+
+def build_orbit_table(launch_table, total_orbits=20, visibility_days=3, cache=None):
+    """
+    Berechnet die Orbit-Tabelle (eine Zeile pro Umrundung, Spalte "launch_id") für
+    alle Starts mit Koordinaten in einem Durchgang. Mit cache (OrbitWindowCache)
+    werden bereits berechnete Umrundungen wiederverwendet.
+
+    Gibt (Orbit-Tabelle, Warnungen) zurück.
+    """
+    warnings = []
+    with_coords = launch_table[launch_table["latitude"].notna() & launch_table["longitude"].notna()]
+    launch_ids = with_coords.index.tolist()
+    launch_specs = list(zip(
+        zip(with_coords["latitude"].tolist(), with_coords["longitude"].tolist()),
+        with_coords["utc_time"].dt.to_pydatetime().tolist(),
+        [description or mission_type for description, mission_type
+         in zip(with_coords["mission_description"], with_coords["mission_type"])]
+    ))
+    try:
+        if cache is not None:
+            table = cache.get_table(launch_specs, launch_ids, total_orbits, visibility_days)
+        else:
+            table = compute_orbit_table(launch_specs, launch_ids, total_orbits, visibility_days)
+    except Exception:
+        # Fallback: Starts einzeln berechnen, damit ein fehlerhafter Start die anderen nicht blockiert
+        tables = []
+        for launch_id, spec in zip(launch_ids, launch_specs):
+            try:
+                tables.append(compute_orbit_table([spec], [launch_id], total_orbits, visibility_days))
+            except Exception as e:
+                warnings.append(f"Fehler bei der Berechnung für {launch_table.at[launch_id, 'name']}: {str(e)}")
+        table = pd.concat(tables, ignore_index=True) if tables else compute_orbit_table([], [])
+    return table, warnings
+
+
+def filter_launches(launch_table, orbit_table, time_range="Alle", visibility_filter=False, now=None):
+    """
+    Filtert die Starts nach Zeitraum und (optional) potenzieller Sichtbarkeit
+    """
+    now = now or datetime.now(pytz.utc)
+    mask = np.ones(len(launch_table), dtype=bool)
+
+    if time_range in time_range_limits:
+        mask &= (launch_table["utc_time"] <= now + time_range_limits[time_range]).to_numpy()
+
+    if visibility_filter:
+        visible_ids = orbit_table.loc[orbit_table["visibility_chance"] > 30, "launch_id"].unique()
+        mask &= launch_table.index.isin(visible_ids)
+
+    return launch_table[mask]
+
+
+def summarize_launches(launch_table, orbit_table):
+    """
+    Übersicht pro Start mit bester Sichtbarkeit und Anzahl guter Sichtbarkeitsfenster
+    """
+    stats = (
+        orbit_table.assign(good=orbit_table["visibility_chance"] > 40)
+        .groupby("launch_id")
+        .agg(best=("visibility_chance", "max"), good=("good", "sum"), count=("orbit_number", "size"))
+        .reindex(launch_table.index, fill_value=0)
+    )
+    return pd.DataFrame({
+        "Name": launch_table["name"].to_numpy(),
+        "Rakete": launch_table["rocket"].to_numpy(),
+        "Orbit": launch_table["orbit_type"].to_numpy(),
+        "Start (UTC)": launch_table["start_utc"].to_numpy(),
+        "Start (DE)": launch_table["start_de"].to_numpy(),
+        "Beste Sichtbarkeit (%)": stats["best"].astype(int).to_numpy(),
+        "Gute Sichtbarkeitsfenster": stats["good"].astype(int).to_numpy(),
+        "Berechnete Umrundungen": stats["count"].astype(int).to_numpy()
+    })
+
+
+def launch_details(launch_table, orbit_table, launch_id):
+    """
+    Alle Angaben zu einem Start als Dictionary, inklusive der Umrundungen
+    als Liste wie bei calculate_rocket_visibility
+    """
+    row = launch_table.loc[launch_id]
+    has_coords = pd.notna(row["latitude"]) and pd.notna(row["longitude"])
+    orbits = orbit_table[orbit_table["launch_id"] == launch_id]
+    return {
+        "id": launch_id,
+        "name": row["name"],
+        "rocket": row["rocket"],
+        "provider": row["provider"],
+        "mission_type": row["mission_type"],
+        "mission_description": row["mission_description"],
+        "pad": row["pad"],
+        "location": row["location"],
+        "coordinates": (float(row["latitude"]), float(row["longitude"])) if has_coords else None,
+        "times": {"Deutschland": row["start_de"], "UTC": row["start_utc"]},
+        "orbit_type": row["orbit_type"],
+        "orbit_visibility": orbit_columns_to_records({name: orbits[name].to_numpy() for name in orbit_columns}),
+        "utc_time": row["utc_time"].to_pydatetime()
+    }
+
+
+def process_launch_chunk(raw_launches, total_orbits=20, visibility_days=3):
+    """
+    Verarbeitet einen Block von Starts vollständig (Parsen, Orbit-Typ und
+    Sichtbarkeit). Läuft auch in Worker-Prozessen.
+
+    Gibt (Start-Tabelle, Orbit-Tabelle, Warnungen) zurück; übersprungene Starts fehlen.
+    """
+    launches = []
+    warnings = []
+    for raw_launch in raw_launches:
+        launch, warning = parse_launch(raw_launch)
+        if warning:
+            warnings.append(warning)
+        if launch is not None:
+            launches.append(launch)
+
+    launch_table = build_launch_table(launches)
+    orbit_table, orbit_warnings = build_orbit_table(launch_table, total_orbits, visibility_days)
+    return launch_table, orbit_table, warnings + orbit_warnings
+
+
+def process_launches_parallel(
+    raw_launches,
+    executor,
+    total_orbits=20,
+    visibility_days=3,
+    chunk_size=None,
+    progress_callback=None
+):
+    """
+    Verteilt die Starts blockweise auf einen Prozess-Pool und fügt die
+    Ergebnisse in der ursprünglichen Reihenfolge wieder zusammen.
+    Gibt (Start-Tabelle, Orbit-Tabelle, Warnungen) zurück.
+
+    progress_callback wird nach jedem fertigen Block mit dem Anteil (0-1) aufgerufen.
+    """
+    if not raw_launches:
+        launch_table = build_launch_table([])
+        return launch_table, build_orbit_table(launch_table)[0], []
+
+    if chunk_size is None:
+        # Einige Blöcke pro Worker, damit langsame Blöcke sich ausgleichen
+        workers = os.cpu_count() or 1
+        chunk_size = max(1, math.ceil(len(raw_launches) / (workers * 4)))
+
+    chunks = [raw_launches[i:i + chunk_size] for i in range(0, len(raw_launches), chunk_size)]
+    futures = {
+        executor.submit(process_launch_chunk, chunk, total_orbits, visibility_days): index
+        for index, chunk in enumerate(chunks)
+    }
+
+    results = [None] * len(chunks)
+    for done, future in enumerate(as_completed(futures), 1):
+        results[futures[future]] = future.result()
+        if progress_callback:
+            progress_callback(done / len(chunks))
+
+    # Start-IDs blockübergreifend eindeutig halten (z.B. ein Start auf zwei API-Seiten):
+    # der erste Block gewinnt, spätere Wiederholungen samt ihren Umrundungen entfallen
+    launch_tables = []
+    orbit_tables = []
+    seen = set()
+    for launch_table, orbit_table, _ in results:
+        repeated = launch_table.index.isin(seen)
+        launch_tables.append(launch_table[~repeated])
+        orbit_tables.append(orbit_table[~orbit_table["launch_id"].isin(launch_table.index[repeated])])
+        seen.update(launch_table.index)
+
+    launch_table = pd.concat(launch_tables)
+    orbit_table = pd.concat(orbit_tables, ignore_index=True)
+    warnings = [warning for _, _, chunk_warnings in results for warning in chunk_warnings]
+    return launch_table.sort_values("utc_time", kind="stable"), orbit_table, warnings
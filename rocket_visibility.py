@@ -0,0 +1,909 @@
+"""
+Orbit- und Sichtbarkeitsberechnung für die Raketenstarts-App.
+
+Dieses Modul enthält keine Streamlit-Aufrufe, damit die Berechnungen auch
+außerhalb der App (Benchmarks, Batch-Export, Hintergrundprozesse) genutzt
+werden können.
+"""
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pytz
+
+# Deutschland-Koordinaten (ungefährer Mittelpunkt)
+germany_coords = (51.1657, 10.4515)
+
+# Zeitzone für die Anzeige der Sichtungszeiten
+de_timezone = pytz.timezone('Europe/Berlin')
+
+# Mittlerer Erdradius in km (für die Haversine-Formel)
+EARTH_RADIUS_KM = 6371.0
+
+# Verschiedene Orbithöhen basierend auf Missionstyp
+orbit_params = {
+    "LEO": {"height": 300, "inclination": 51.6},  # Typisch für ISS
+    "MEO": {"height": 20000, "inclination": 55},  # Medium Earth Orbit
+    "GEO": {"height": 35786, "inclination": 0},   # Geostationärer Orbit
+    "SSO": {"height": 600, "inclination": 97.8}   # Sonnensynchroner Orbit
+}
+
+# Gitter für die Sichtbarkeits-Heatmap: (Breite min, Breite max, Länge min, Länge max) und Schrittweite in Grad
+observer_regions = {
+    "Deutschland": {"bounds": (47.0, 55.5, 5.5, 15.5), "step": 0.25},
+    "Europa": {"bounds": (35.0, 71.0, -11.0, 40.0), "step": 1.0}
+}
+
+# Sichtbarkeitstexte und Faktoren nach Himmelshelligkeit beim Beobachter (Sonnenhöhe)
+_visibility_texts = np.array([
+    "Sehr gut (dunkler Nachthimmel)",
+    "Gut (Dämmerung)",
+    "Mäßig (Heller Himmel)",
+    "Schlecht (Tageslicht)"
+], dtype=object)
+_time_factors = np.array([1.0, 0.8, 0.4, 0.1])
+
+_US_PER_MINUTE = 60_000_000
+_US_PER_DAY = 86_400_000_000
+_SECONDS_PER_DAY = 86_400
+
+# Überflugvorhersage: Mindesthöhe über dem Horizont und maximale Sonnenhöhe
+# beim Beobachter (bürgerliche Dämmerung), jeweils in Grad
+MIN_ELEVATION = 10.0
+MAX_SUN_ELEVATION = -6.0
+
+# Rasterpunkte pro Umrundung und Verfeinerungsschritte der Suche
+COARSE_STEPS = 120
+BISECTION_STEPS = 12
+TERNARY_STEPS = 20
+
+# Umrundungen pro Rechenblock (begrenzt den Speicher für das grobe Raster)
+ROW_BLOCK = 2048
+
+
+# Verbesserte Funktion zur Berechnung der Orbit-Umlaufzeit
+def calculate_orbit_period(orbit_height):
+    """
+    Berechnet die Umlaufzeit eines Orbits basierend auf der Höhe
+    """
+    earth_radius = 6371  # km
+    gravitational_parameter = 3.986004418e14  # m³/s² (GM für die Erde)
+    orbit_radius = (earth_radius + orbit_height) * 1000  # m
+
+    # Kepler's Third Law: T² = (4π²/GM) * r³
+    orbit_period_seconds = 2 * math.pi * math.sqrt(orbit_radius**3 / gravitational_parameter)
+    return orbit_period_seconds / 60  # Minuten
+
+
+@lru_cache(maxsize=256)
+def _ground_track(site_lat, site_lon, inclination, resolution, revolutions, orbit_period_minutes):
+    """
+    Vektorisierte Bodenspur als schreibgeschütztes (N, 2)-Array (Breite, Länge).
+    Zwischengespeichert pro (Startort, Inklination, Auflösung, Umläufe, Umlaufzeit).
+    """
+    # Umrechnung in Radians
+    lat1_rad = np.radians(site_lat)
+    lon1_rad = np.radians(site_lon)
+    inclination_rad = np.radians(inclination)
+
+    # Winkel entlang der geneigten Umlaufbahn für alle Umläufe
+    angles = np.arange(0, 360 * revolutions, resolution)
+    angle_rad = np.radians(angles)
+
+    # Einfaches Modell für geneigte Umlaufbahn
+    # (Dies ist eine Vereinfachung, tatsächliche Orbits sind komplexer)
+    lat_rad = np.arcsin(np.sin(lat1_rad) * np.cos(inclination_rad) +
+                        np.cos(lat1_rad) * np.sin(inclination_rad) * np.sin(angle_rad))
+
+    lon_diff = np.arctan2(np.sin(angle_rad) * np.cos(inclination_rad),
+                          np.cos(angle_rad) - np.sin(lat1_rad) * np.sin(lat_rad))
+
+    # Bei bekannter Umlaufzeit dreht sich die Erde unter der Bahn weiter (Westdrift)
+    if orbit_period_minutes:
+        earth_rotation_per_orbit = (orbit_period_minutes / (24 * 60)) * 360
+        lon_diff = lon_diff - np.radians(angles / 360 * earth_rotation_per_orbit)
+
+    lon_rad = ((lon1_rad + lon_diff + np.pi) % (2 * np.pi)) - np.pi
+
+    track = np.column_stack((np.degrees(lat_rad), np.degrees(lon_rad)))
+    track.flags.writeable = False
+    return track
+
+
+def calculate_ground_track(
+    launch_site_coords,
+    inclination=51.6,
+    revolutions=1,
+    resolution=5.0,
+    orbit_period_minutes=None
+):
+    """
+    Erstellt die Bodenspur über mehrere Umläufe mit wählbarer Winkelauflösung (Grad).
+    Mit orbit_period_minutes wird die Erdrotation zwischen den Umläufen berücksichtigt.
+    """
+    return _ground_track(
+        float(launch_site_coords[0]),
+        float(launch_site_coords[1]),
+        float(inclination),
+        float(resolution),
+        int(revolutions),
+        float(orbit_period_minutes) if orbit_period_minutes else None
+    )
+
+
+def split_ground_track(track, max_jump=180):
+    """
+    Teilt eine Bodenspur an der Datumsgrenze in Segmente auf, damit die Karte
+    keine Linien quer über die Welt zeichnet
+    """
+    if len(track) == 0:
+        return []
+    jumps = np.nonzero(np.abs(np.diff(track[:, 1])) > max_jump)[0] + 1
+    return [segment.tolist() for segment in np.split(track, jumps) if len(segment) > 1]
+
+
+# Funktion zur Berechnung der Orbit-Punkte für die Visualisierung
+def calculate_orbit_path(launch_site_coords, inclination=51.6):
+    """
+    Erstellt einen vereinfachten Orbit-Pfad für die Visualisierung
+    """
+    track = calculate_ground_track(launch_site_coords, inclination)
+    return [tuple(point) for point in track.tolist()]
+
+
+def detect_orbit_type(mission_type):
+    """
+    Erkennt den Orbit-Typ aus Missionstyp oder -beschreibung (Standard: LEO)
+    """
+    orbit_type = "LEO"
+    if mission_type and isinstance(mission_type, str):
+        mission_lower = mission_type.lower()
+        if "geo" in mission_lower:
+            orbit_type = "GEO"
+        elif "meo" in mission_lower:
+            orbit_type = "MEO"
+        elif ("sun" in mission_lower and "syn" in mission_lower) or "sso" in mission_lower:
+            orbit_type = "SSO"
+    return orbit_type
+
+
+def orbit_period_for_type(orbit_type):
+    """
+    Umlaufzeit in Minuten für einen Orbit-Typ
+    """
+    # Bei geostationärem Orbit ist die Periode immer ca. 24 Stunden
+    if orbit_type == "GEO":
+        return 24 * 60
+    return calculate_orbit_period(orbit_params[orbit_type]["height"])
+
+
+def _orbits_in_range_mask(period_minutes, total_orbits, visibility_days):
+    """
+    Matrix (Starts x Umrundungen 1..total_orbits): eine Umrundung wird nur
+    berechnet, solange die vorherige noch innerhalb des Zeitraums lag
+    """
+    orbit_numbers = np.arange(1, total_orbits + 1)
+    previous_offset_us = _minutes_to_us(np.asarray(period_minutes, dtype=float)[:, None] * (orbit_numbers - 1))
+    return previous_offset_us < visibility_days * _US_PER_DAY
+
+
+def count_orbits_in_range(period_minutes, total_orbits, visibility_days):
+    """
+    Anzahl der Umrundungen pro Start, die für die Einstellungen berechnet werden
+    """
+    return _orbits_in_range_mask(period_minutes, total_orbits, visibility_days).sum(axis=1)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Großkreisentfernung in km, elementweise für NumPy-Arrays (Grad als Eingabe)
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+
+def _minutes_to_us(minutes):
+    """
+    Rechnet Minuten (float-Array) exakt so in Mikrosekunden um wie
+    timedelta(minutes=...), damit die Zeitstempel bitgenau übereinstimmen
+    """
+    int_part = np.trunc(minutes)
+    us = (minutes - int_part) * _US_PER_MINUTE
+    us_int = np.trunc(us)
+    leftover = us - us_int
+    base = int_part.astype(np.int64) * _US_PER_MINUTE + us_int.astype(np.int64)
+
+    # Runden auf ganze Mikrosekunden (bei exakt 0.5 auf gerade Werte)
+    halfway = np.abs(leftover) == 0.5
+    whole = np.where(
+        halfway,
+        np.copysign(base & 1, leftover),
+        np.trunc(leftover + np.copysign(0.5, leftover))
+    )
+    return base + whole.astype(np.int64)
+
+
+def _to_utc_us(launch_time_utc):
+    """
+    Startzeit als Mikrosekunden seit Epoche; die Uhrzeit wird als UTC interpretiert
+    """
+    naive = launch_time_utc.replace(tzinfo=None)
+    return np.datetime64(naive, 'us').astype(np.int64)
+
+
+def _to_local_us(values_us):
+    """
+    Rechnet UTC-Mikrosekunden vektorisiert in deutsche Ortszeit um (inkl. Sommerzeit)
+    """
+    return (
+        pd.DatetimeIndex(values_us.astype('datetime64[us]'))
+        .tz_localize(pytz.UTC)
+        .tz_convert(de_timezone)
+        .tz_localize(None)
+        .values.astype('datetime64[us]')
+        .astype(np.int64)
+    )
+
+
+def _format_times(values_us, part):
+    """
+    Formatiert Mikrosekunden-Zeitstempel vektorisiert wie strftime
+    ("datetime": %Y-%m-%d %H:%M:%S, "date": %Y-%m-%d, "time": %H:%M:%S)
+    """
+    if len(values_us) == 0:
+        return np.array([], dtype=str)
+    text = np.datetime_as_string(values_us.astype('datetime64[us]'), unit='s').astype(str)
+    if part == "datetime":
+        return np.char.replace(text, "T", " ")
+    if part == "time":
+        return np.char.partition(text, "T")[:, 2]
+    return np.char.partition(text, "T")[:, 0]
+
+
+def _sun_direction(unix_seconds):
+    """
+    Einheitsvektor zur Sonne im erdfesten System (x: Greenwich-Meridian, z: Nordpol),
+    vektorisiert mit den Näherungsformeln des Astronomical Almanac (ca. 0.01° genau)
+    """
+    days = unix_seconds / 86400.0 + 2440587.5 - 2451545.0  # Tage seit J2000.0
+    mean_longitude = np.radians((280.460 + 0.9856474 * days) % 360)
+    mean_anomaly = np.radians((357.528 + 0.9856003 * days) % 360)
+    ecliptic_longitude = (mean_longitude + np.radians(1.915) * np.sin(mean_anomaly) +
+                          np.radians(0.020) * np.sin(2 * mean_anomaly))
+    obliquity = np.radians(23.439 - 0.0000004 * days)
+
+    right_ascension = np.arctan2(np.cos(obliquity) * np.sin(ecliptic_longitude), np.cos(ecliptic_longitude))
+    declination = np.arcsin(np.sin(obliquity) * np.sin(ecliptic_longitude))
+    sidereal_time = np.radians((280.46061837 + 360.98564736629 * days) % 360)
+
+    # Länge des Subsolarpunkts
+    longitude = right_ascension - sidereal_time
+    return np.stack((
+        np.cos(declination) * np.cos(longitude),
+        np.cos(declination) * np.sin(longitude),
+        np.sin(declination)
+    ), axis=-1)
+
+
+def _unit_vectors(lat_deg, lon_deg):
+    """
+    Erdfeste Einheitsvektoren (..., 3) für geografische Koordinaten in Grad
+    """
+    lat = np.radians(lat_deg)
+    lon = np.radians(lon_deg)
+    return np.stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)), axis=-1)
+
+
+def _orbit_elements(site_lat, site_lon, inclination):
+    """
+    Startwinkel in der Bahnebene und Länge des aufsteigenden Knotens (Radiant),
+    so dass die Bahn zum Startzeitpunkt aufsteigend über dem Startort liegt.
+    Liegt der Startort außerhalb der Inklination, beginnt die Bahn am nördlichsten
+    bzw. südlichsten Punkt.
+    """
+    sin_inclination = np.sin(np.radians(inclination))
+    ratio = np.divide(
+        np.sin(np.radians(site_lat)), sin_inclination,
+        out=np.sign(site_lat).astype(float), where=sin_inclination > 1e-9
+    )
+    start_angle = np.arcsin(np.clip(ratio, -1.0, 1.0))
+    node_longitude = np.radians(site_lon) - np.arctan2(
+        np.cos(np.radians(inclination)) * np.sin(start_angle), np.cos(start_angle)
+    )
+    return start_angle, node_longitude
+
+
+def _satellite_positions(seconds, start_angle, node_longitude, inclination, period_minutes, radius_km):
+    """
+    Erdfeste Position (km) auf einer Kreisbahn, seconds nach dem Start.
+    Alle Parameter werden per Broadcasting mit seconds kombiniert.
+    """
+    inclination_rad = np.radians(inclination)
+    angle = start_angle + 2 * np.pi * seconds / (period_minutes * 60)
+    # Die Erde dreht sich unter der Bahn weiter (ca. 15° pro Stunde)
+    node = node_longitude - 2 * np.pi * seconds / _SECONDS_PER_DAY
+
+    x_orbit = np.cos(angle)
+    y_orbit = np.sin(angle) * np.cos(inclination_rad)
+    return radius_km[..., None] * np.stack((
+        x_orbit * np.cos(node) - y_orbit * np.sin(node),
+        x_orbit * np.sin(node) + y_orbit * np.cos(node),
+        np.sin(angle) * np.sin(inclination_rad) * np.ones_like(node)
+    ), axis=-1)
+
+
+def _sky_geometry(satellite, sun, observer_up):
+    """
+    Höhenwinkel des Objekts und der Sonne beim Beobachter (Grad) sowie, ob das
+    Objekt von der Sonne beleuchtet wird (zylindrischer Erdschatten).
+    satellite und sun haben die Form (..., 3), observer_up (3,) oder passend zum Broadcasting.
+    """
+    radius_sq = np.einsum("...i,...i->...", satellite, satellite)
+    satellite_up = np.einsum("...i,...i->...", satellite, observer_up)
+
+    # Höhenwinkel aus Skalarprodukten: |d|² = r² - 2R(s·up) + R² mit d = s - R·up
+    range_km = np.sqrt(np.maximum(radius_sq - 2 * EARTH_RADIUS_KM * satellite_up + EARTH_RADIUS_KM ** 2, 1e-9))
+    elevation = np.degrees(np.arcsin(np.clip((satellite_up - EARTH_RADIUS_KM) / range_km, -1.0, 1.0)))
+    sun_elevation = np.degrees(np.arcsin(np.clip(np.einsum("...i,...i->...", sun, observer_up), -1.0, 1.0)))
+
+    # Im Schatten: hinter der Erde (von der Sonne aus) und innerhalb des Erdradius zur Schattenachse
+    sun_projection = np.einsum("...i,...i->...", satellite, sun)
+    in_shadow = (sun_projection < 0) & (radius_sq - sun_projection ** 2 < EARTH_RADIUS_KM ** 2)
+    return elevation, sun_elevation, ~in_shadow
+
+
+def _sky_class(sun_elevation):
+    """
+    Himmelshelligkeit beim Beobachter (Index in _visibility_texts) nach Sonnenhöhe
+    """
+    return np.select(
+        [sun_elevation < -12, sun_elevation < -6, sun_elevation < 0],
+        [0, 1, 2],
+        default=3
+    )
+
+
+def _pass_chance(elevation, sun_elevation, visible, is_geo):
+    """
+    Sichtbarkeitswahrscheinlichkeit (0-100%) eines Überflugs aus dem maximalen
+    Höhenwinkel und der Himmelshelligkeit; nicht sichtbare Überflüge erhalten 0
+    """
+    # Höhere Überflüge sind länger und heller zu sehen
+    elevation_factor = 0.5 + 0.5 * np.clip((elevation - MIN_ELEVATION) / (60.0 - MIN_ELEVATION), 0.0, 1.0)
+    time_factor = _time_factors[_sky_class(sun_elevation)]
+    chance = np.where(visible, np.trunc(elevation_factor * time_factor * 100), 0).astype(np.int64)
+
+    # GEO ist schwieriger zu sehen
+    return np.where(is_geo, np.trunc(chance * 0.7).astype(np.int64), chance)
+
+
+def _is_visible(elevation, sun_elevation, sunlit):
+    """
+    Sichtbar: über MIN_ELEVATION, von der Sonne beleuchtet und beim Beobachter dunkel
+    """
+    return (elevation >= MIN_ELEVATION) & sunlit & (sun_elevation < MAX_SUN_ELEVATION)
+
+
+def _launch_parameters(launch_specs):
+    """
+    Bahnparameter pro Start als Arrays (Orbit-Typ, Startzeit, Umlaufzeit, Inklination, Bahnradius, Startwinkel, Knoten)
+    """
+    n_launches = len(launch_specs)
+    orbit_types = np.empty(n_launches, dtype=object)
+    launch_us = np.empty(n_launches, dtype=np.int64)
+    site_lat = np.empty(n_launches)
+    site_lon = np.empty(n_launches)
+    period_minutes = np.empty(n_launches)
+    inclination = np.empty(n_launches)
+    radius_km = np.empty(n_launches)
+
+    for i, (launch_site_coords, launch_time_utc, mission_type) in enumerate(launch_specs):
+        orbit_type = detect_orbit_type(mission_type)
+        orbit_types[i] = orbit_type
+        site_lat[i], site_lon[i] = launch_site_coords
+        launch_us[i] = _to_utc_us(launch_time_utc)
+        period_minutes[i] = orbit_period_for_type(orbit_type)
+        inclination[i] = orbit_params[orbit_type]["inclination"]
+        radius_km[i] = EARTH_RADIUS_KM + orbit_params[orbit_type]["height"]
+
+    start_angle, node_longitude = _orbit_elements(site_lat, site_lon, inclination)
+    return {
+        "orbit_type": orbit_types,
+        "launch_us": launch_us,
+        "period_minutes": period_minutes,
+        "inclination": inclination,
+        "radius_km": radius_km,
+        "start_angle": start_angle,
+        "node_longitude": node_longitude,
+    }
+
+
+def _orbit_rows(params, total_orbits, visibility_days, first_orbits=None):
+    """
+    Zeilen (Start-Index, Orbitnummer) aller zu berechnenden Umrundungen
+    """
+    orbit_numbers = np.arange(1, total_orbits + 1)
+    in_range = _orbits_in_range_mask(params["period_minutes"], total_orbits, visibility_days)
+    if first_orbits is not None:
+        in_range &= orbit_numbers[None, :] >= np.asarray(first_orbits)[:, None]
+    launch_index, column = np.nonzero(in_range)
+    return launch_index, orbit_numbers[column]
+
+
+def _coarse_samples(params, launch_index, orbit_number):
+    """
+    Grobes Zeitraster (Sekunden nach dem Start) über jede Umrundung und die
+    zugehörigen Objekt- und Sonnenpositionen, Form (Umrundungen, COARSE_STEPS + 1)
+    """
+    period_seconds = params["period_minutes"][launch_index] * 60
+    steps = np.arange(COARSE_STEPS + 1) / COARSE_STEPS
+    seconds = period_seconds[:, None] * ((orbit_number - 1)[:, None] + steps[None, :])
+    satellite = _satellite_positions(
+        seconds,
+        params["start_angle"][launch_index, None],
+        params["node_longitude"][launch_index, None],
+        params["inclination"][launch_index, None],
+        params["period_minutes"][launch_index, None],
+        params["radius_km"][launch_index, None]
+    )
+    unix_seconds = params["launch_us"][launch_index, None] / 1e6 + seconds
+    return seconds, satellite, _sun_direction(unix_seconds)
+
+
+def compute_orbit_windows(
+    launch_specs,
+    total_orbits=20,
+    visibility_days=3,
+    observer_coords=germany_coords,
+    first_orbits=None
+):
+    """
+    Sagt für jede Umrundung aller Starts den besten Überflug über dem Beobachter voraus.
+
+    Die Bahn wird als Kreisbahn mit Erdrotation auf einem groben Zeitraster
+    (COARSE_STEPS Punkte pro Umrundung) propagiert. Für jeden Punkt werden der
+    Höhenwinkel beim Beobachter, die Sonnenhöhe und die Beleuchtung des Objekts
+    bestimmt. Beginn und Ende des sichtbaren Fensters werden anschließend per
+    Bisektion, der höchste Punkt per ternärer Suche verfeinert.
+
+    launch_specs ist eine Liste von (launch_site_coords, launch_time_utc, mission_type).
+    Mit first_orbits (eine Orbitnummer pro Start) werden nur die Umrundungen ab
+    dieser Nummer berechnet, z.B. um einen Cache zu ergänzen.
+    Zurückgegeben wird ein Dictionary mit flachen NumPy-Arrays (eine Zeile pro
+    Umrundung); "launch_index" ordnet jede Zeile ihrem Start zu.
+    """
+    params = _launch_parameters(launch_specs)
+    launch_index, orbit_number = _orbit_rows(params, total_orbits, visibility_days, first_orbits)
+
+    # Blockweise vorhersagen, damit das grobe Raster auch bei vielen Starts wenig Speicher braucht
+    blocks = [
+        _predict_passes(
+            params,
+            launch_index[start:start + ROW_BLOCK],
+            orbit_number[start:start + ROW_BLOCK],
+            observer_coords
+        )
+        for start in range(0, max(len(launch_index), 1), ROW_BLOCK)
+    ]
+    if len(blocks) == 1:
+        return blocks[0]
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def _predict_passes(params, launch_index, orbit_number, observer_coords):
+    """
+    Überflugvorhersage für einen Block von Umrundungen (siehe compute_orbit_windows)
+    """
+    observer_up = _unit_vectors(observer_coords[0], observer_coords[1])
+
+    # Zustand zu beliebigen Zeitpunkten (eine Zeit pro Umrundung)
+    def sky_at(seconds):
+        satellite = _satellite_positions(
+            seconds,
+            params["start_angle"][launch_index],
+            params["node_longitude"][launch_index],
+            params["inclination"][launch_index],
+            params["period_minutes"][launch_index],
+            params["radius_km"][launch_index]
+        )
+        sun = _sun_direction(params["launch_us"][launch_index] / 1e6 + seconds)
+        return satellite, _sky_geometry(satellite, sun, observer_up)
+
+    # 1. Grobes Raster: bester (sichtbarer) Punkt und zusammenhängendes Fenster darum
+    seconds, satellite, sun = _coarse_samples(params, launch_index, orbit_number)
+    elevation, sun_elevation, sunlit = _sky_geometry(satellite, sun, observer_up)
+    visible = _is_visible(elevation, sun_elevation, sunlit)
+    has_pass = visible.any(axis=1)
+    peak = np.argmax(np.where(visible | ~has_pass[:, None], elevation, -np.inf), axis=1)
+
+    sample_index = np.arange(COARSE_STEPS + 1)
+    left = np.max(np.where(~visible & (sample_index < peak[:, None]), sample_index, -1), axis=1)
+    right = np.min(np.where(~visible & (sample_index > peak[:, None]), sample_index, COARSE_STEPS + 1), axis=1)
+
+    rows = np.arange(len(peak))
+    orbit_start = seconds[:, 0]
+    orbit_end = seconds[:, -1]
+
+    # 2. Fenstergrenzen per Bisektion zwischen unsichtbarem und sichtbarem Rasterpunkt
+    def bisect(outside, inside, refine):
+        for _ in range(BISECTION_STEPS):
+            middle = (outside + inside) / 2
+            _, (m_elevation, m_sun_elevation, m_sunlit) = sky_at(middle)
+            middle_visible = _is_visible(m_elevation, m_sun_elevation, m_sunlit)
+            inside = np.where(refine & middle_visible, middle, inside)
+            outside = np.where(refine & ~middle_visible, middle, outside)
+        return inside
+
+    refine_start = has_pass & (left >= 0)
+    refine_end = has_pass & (right <= COARSE_STEPS)
+    window_start = bisect(
+        seconds[rows, np.maximum(left, 0)], seconds[rows, np.minimum(left + 1, COARSE_STEPS)], refine_start
+    )
+    window_end = bisect(
+        seconds[rows, np.minimum(right, COARSE_STEPS)], seconds[rows, np.maximum(right - 1, 0)], refine_end
+    )
+    window_start = np.where(refine_start, window_start, np.where(has_pass, orbit_start, 0))
+    window_end = np.where(refine_end, window_end, np.where(has_pass, orbit_end, 0))
+
+    # 3. Höchster Punkt per ternärer Suche um den besten Rasterpunkt (innerhalb des Fensters)
+    step_seconds = params["period_minutes"][launch_index] * 60 / COARSE_STEPS
+    low = seconds[rows, peak] - step_seconds
+    high = seconds[rows, peak] + step_seconds
+    low = np.where(has_pass, np.maximum(low, window_start), np.maximum(low, orbit_start))
+    high = np.where(has_pass, np.minimum(high, window_end), np.minimum(high, orbit_end))
+    for _ in range(TERNARY_STEPS):
+        third = (high - low) / 3
+        _, (elevation_low, _, _) = sky_at(low + third)
+        _, (elevation_high, _, _) = sky_at(high - third)
+        rising = elevation_low < elevation_high
+        low = np.where(rising, low + third, low)
+        high = np.where(rising, high, high - third)
+    peak_seconds = (low + high) / 2
+
+    # Ohne sichtbaren Überflug hat das Fenster keine Dauer
+    window_start = np.where(has_pass, window_start, peak_seconds)
+    window_end = np.where(has_pass, window_end, peak_seconds)
+
+    satellite, (peak_elevation, peak_sun_elevation, _) = sky_at(peak_seconds)
+    radius = np.linalg.norm(satellite, axis=-1)
+    latitude = np.degrees(np.arcsin(satellite[:, 2] / radius))
+    longitude = np.degrees(np.arctan2(satellite[:, 1], satellite[:, 0]))
+
+    # Zeiten (UTC und deutsche Ortszeit, Mikrosekunden)
+    launch_us = params["launch_us"][launch_index]
+    time_utc_us = launch_us + np.round(peak_seconds * 1e6).astype(np.int64)
+    start_utc_us = launch_us + np.round(window_start * 1e6).astype(np.int64)
+    end_utc_us = launch_us + np.round(window_end * 1e6).astype(np.int64)
+    time_de_us, start_de_us, end_de_us = np.split(
+        _to_local_us(np.concatenate((time_utc_us, start_utc_us, end_utc_us))), 3
+    )
+
+    orbit_types = params["orbit_type"][launch_index]
+    time_class = _sky_class(peak_sun_elevation)
+    visibility_chance = _pass_chance(peak_elevation, peak_sun_elevation, has_pass, orbit_types == "GEO")
+
+    return {
+        "launch_index": launch_index,
+        "orbit_number": orbit_number,
+        "orbit_type": orbit_types,
+        "time_utc_us": time_utc_us,
+        "time_de_us": time_de_us,
+        "window_start_de_us": start_de_us,
+        "window_end_de_us": end_de_us,
+        "latitude": latitude,
+        "longitude": longitude,
+        "distance_km": haversine_km(observer_coords[0], observer_coords[1], latitude, longitude),
+        "elevation": peak_elevation,
+        "sun_elevation": peak_sun_elevation,
+        "time_class": time_class,
+        "time_factor": _time_factors[time_class],
+        "visibility_chance": visibility_chance,
+        "duration_minutes": np.round((window_end - window_start) / 60).astype(np.int64),
+    }
+
+
+# Spalten der Orbit-Tabelle (eine Zeile pro Umrundung)
+orbit_columns = (
+    "orbit_number", "time_utc", "time_de", "visibility_chance", "visibility_text",
+    "window_start", "window_end", "visibility_date", "duration_minutes", "orbit_type",
+    "hinweis", "latitude", "longitude"
+)
+
+
+def orbit_window_columns(windows):
+    """
+    Formatiert die Arrays aus compute_orbit_windows vektorisiert zu den
+    Anzeige-Spalten (siehe orbit_columns) plus "launch_index"
+    """
+    orbit_type = windows["orbit_type"].astype(str)
+    visibility_chance = windows["visibility_chance"]
+
+    # Orbit-Typ spezifische Hinweise
+    chance_text = np.char.add(np.char.add(" - Sichtbarkeit ", visibility_chance.astype(str)), "%")
+    generic_note = np.char.add(
+        np.char.add(orbit_type, "-Orbit"),
+        np.where(visibility_chance > 0, chance_text, " - Wahrscheinlich nicht sichtbar")
+    )
+    visibility_note = np.where(
+        orbit_type == "GEO",
+        "Geostationärer Orbit - Position bleibt fest am Himmel",
+        np.where(orbit_type == "SSO", "Sonnensynchroner Orbit - Fliegt meist morgens/abends über", generic_note)
+    )
+
+    return {
+        "launch_index": windows["launch_index"],
+        "orbit_number": windows["orbit_number"],
+        "time_utc": _format_times(windows["time_utc_us"], "datetime"),
+        "time_de": _format_times(windows["time_de_us"], "datetime"),
+        "visibility_chance": visibility_chance,
+        "visibility_text": _visibility_texts[windows["time_class"]].astype(str),
+        "window_start": _format_times(windows["window_start_de_us"], "time"),
+        "window_end": _format_times(windows["window_end_de_us"], "time"),
+        "visibility_date": _format_times(windows["time_de_us"], "date"),
+        "duration_minutes": windows["duration_minutes"],
+        "orbit_type": orbit_type,
+        "hinweis": visibility_note,
+        "latitude": windows["latitude"],
+        "longitude": windows["longitude"],
+    }
+
+
+def _split_columns(columns, n_launches):
+    """
+    Teilt die Spalten (nach launch_index sortiert) in eine Spalten-Gruppe pro Start
+    """
+    bounds = np.searchsorted(columns["launch_index"], np.arange(n_launches + 1))
+    return [
+        {name: columns[name][start:stop] for name in orbit_columns}
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def orbit_columns_to_records(columns):
+    """
+    Wandelt die Spalten eines Starts in die bisherigen Orbit-Dictionaries um
+    """
+    values = {name: columns[name].tolist() for name in orbit_columns}
+    return [
+        {
+            "orbit_number": orbit_number,
+            "time_utc": t_utc,
+            "time_de": t_de,
+            "visibility_chance": visibility_chance,
+            "visibility_text": text,
+            "window_start": w_start,
+            "window_end": w_end,
+            "visibility_date": date,
+            "duration_minutes": duration,
+            "orbit_type": orbit_type,
+            "hinweis": note,
+            "coords": (latitude, longitude)
+        }
+        for (orbit_number, t_utc, t_de, visibility_chance, text, w_start, w_end,
+             date, duration, orbit_type, note, latitude, longitude)
+        in zip(*(values[name] for name in orbit_columns))
+    ]
+
+
+def orbit_windows_to_records(windows, n_launches):
+    """
+    Wandelt die Arrays aus compute_orbit_windows in die bisherigen
+    Orbit-Dictionaries um (eine Liste pro Start)
+    """
+    columns = orbit_window_columns(windows)
+    return [orbit_columns_to_records(group) for group in _split_columns(columns, n_launches)]
+
+
+def orbit_table(column_groups, launch_ids):
+    """
+    Baut aus den Spalten-Gruppen (eine pro Start) eine flache Tabelle mit
+    einer Zeile pro Umrundung und der Spalte "launch_id"
+    """
+    counts = [len(group["orbit_number"]) for group in column_groups]
+    data = {"launch_id": np.repeat(np.asarray(launch_ids, dtype=object), counts)}
+    for name in orbit_columns:
+        if column_groups:
+            data[name] = np.concatenate([group[name] for group in column_groups])
+        else:
+            data[name] = np.array([])
+    return pd.DataFrame(data)
+
+
+def compute_orbit_table(launch_specs, launch_ids, total_orbits=20, visibility_days=3):
+    """
+    Berechnet die Orbit-Tabelle für mehrere Starts ohne Cache
+    """
+    windows = compute_orbit_windows(launch_specs, total_orbits, visibility_days)
+    return orbit_table(_split_columns(orbit_window_columns(windows), len(launch_specs)), launch_ids)
+
+
+def calculate_visibility_batch(launch_specs, total_orbits=20, visibility_days=3, observer_coords=germany_coords):
+    """
+    Berechnet die Sichtungszeitfenster für mehrere Starts auf einmal.
+    Liefert pro Start die gleiche Liste wie calculate_rocket_visibility.
+    """
+    windows = compute_orbit_windows(launch_specs, total_orbits, visibility_days, observer_coords)
+    return orbit_windows_to_records(windows, len(launch_specs))
+
+
+# Verbesserte Funktion zur präzisen Berechnung der Sichtbarkeitszeiten und Umrundungen
+def calculate_rocket_visibility(
+    launch_site_coords,
+    launch_time_utc,
+    mission_type="LEO",
+    total_orbits=20,
+    visibility_days=3,
+    observer_coords=germany_coords
+):
+    """
+    Berechnet wann eine Rakete nach dem Start von Deutschland (oder einem anderen
+    Beobachtungsort) aus sichtbar sein könnte, unter Berücksichtigung der
+    Erdrotation und des orbitalen Mechanismus.
+    """
+    return calculate_visibility_batch(
+        [(launch_site_coords, launch_time_utc, mission_type)],
+        total_orbits=total_orbits,
+        visibility_days=visibility_days,
+        observer_coords=observer_coords
+    )[0]
+
+
+def observer_grid(bounds, step):
+    """
+    Gitter von Beobachtungsorten als flache Arrays (Breite, Länge).
+    bounds ist (Breite min, Breite max, Länge min, Länge max) in Grad.
+    """
+    lat_min, lat_max, lon_min, lon_max = bounds
+    latitudes = np.arange(lat_min, lat_max + step / 2, step)
+    longitudes = np.arange(lon_min, lon_max + step / 2, step)
+    lat_grid, lon_grid = np.meshgrid(latitudes, longitudes, indexing="ij")
+    return lat_grid.ravel(), lon_grid.ravel()
+
+
+def compute_grid_visibility(
+    launch_spec,
+    observer_lat,
+    observer_lon,
+    total_orbits=20,
+    visibility_days=3,
+    chunk_size=256
+):
+    """
+    Bewertet alle Umrundungen eines Starts gegen viele Beobachtungsorte auf einmal.
+
+    Die Bahn- und Sonnenpositionen auf dem groben Zeitraster werden nur einmal
+    berechnet; Höhenwinkel und Sonnenhöhe entstehen als Matrix (Rasterpunkte x Orte),
+    die in Blöcken von chunk_size Orten ausgewertet wird. Die Verfeinerung per
+    Bisektion entfällt, die Werte entsprechen dem groben Raster.
+    Gibt pro Ort eine Zeile mit bester Sichtbarkeit, Anzahl guter Fenster (>40%)
+    und der besten Umrundung zurück.
+    """
+    observer_lat = np.asarray(observer_lat, dtype=float)
+    observer_lon = np.asarray(observer_lon, dtype=float)
+    params = _launch_parameters([launch_spec])
+    launch_index, orbit_number = _orbit_rows(params, total_orbits, visibility_days)
+
+    n_observers = len(observer_lat)
+    best = np.zeros(n_observers, dtype=np.int64)
+    good = np.zeros(n_observers, dtype=np.int64)
+    best_orbit = np.zeros(n_observers, dtype=np.int64)
+
+    if len(orbit_number):
+        _, satellite, sun = _coarse_samples(params, launch_index, orbit_number)
+        n_orbits, n_samples = satellite.shape[:2]
+        # Alle Rasterpunkte als Zeilen, die Orte als Spalten
+        satellite = satellite.reshape(-1, 3)
+        sun = sun.reshape(-1, 3)
+        radius_sq = np.einsum("ij,ij->i", satellite, satellite)[:, None]
+        sun_projection = np.einsum("ij,ij->i", satellite, sun)[:, None]
+        sunlit = ~((sun_projection < 0) & (radius_sq - sun_projection ** 2 < EARTH_RADIUS_KM ** 2))
+        is_geo = params["orbit_type"][0] == "GEO"
+
+        for start in range(0, n_observers, chunk_size):
+            cells = slice(start, start + chunk_size)
+            observer_up = _unit_vectors(observer_lat[cells], observer_lon[cells])
+            satellite_up = satellite @ observer_up.T
+            range_km = np.sqrt(np.maximum(radius_sq - 2 * EARTH_RADIUS_KM * satellite_up + EARTH_RADIUS_KM ** 2, 1e-9))
+            elevation = np.degrees(np.arcsin(np.clip((satellite_up - EARTH_RADIUS_KM) / range_km, -1.0, 1.0)))
+            sun_elevation = np.degrees(np.arcsin(np.clip(sun @ observer_up.T, -1.0, 1.0)))
+
+            visible = _is_visible(elevation, sun_elevation, sunlit)
+            chances = _pass_chance(elevation, sun_elevation, visible, is_geo)
+            # Beste Sichtbarkeit pro Umrundung und Ort
+            chances = chances.reshape(n_orbits, n_samples, -1).max(axis=1)
+            best[cells] = chances.max(axis=0)
+            good[cells] = (chances > 40).sum(axis=0)
+            best_orbit[cells] = np.where(best[cells] > 0, orbit_number[chances.argmax(axis=0)], 0)
+
+    return pd.DataFrame({
+        "latitude": observer_lat,
+        "longitude": observer_lon,
+        "best_visibility": best,
+        "good_windows": good,
+        "best_orbit": best_orbit
+    })
+
+
+class OrbitWindowCache:
+    """
+    LRU-Cache für berechnete Sichtungszeitfenster, damit Änderungen an den
+    Schiebereglern nicht alle Umrundungen erneut berechnen.
+
+    Schlüssel pro Start ist (Start-ID, Koordinaten, Startzeit, Orbit-Typ).
+    Werden mehr Umrundungen oder Tage angefragt als bereits berechnet, wird nur
+    der fehlende Rest ab der nächsten Orbitnummer ergänzt.
+    """
+
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_columns(self, launch_specs, launch_ids, total_orbits, visibility_days):
+        """
+        Liefert eine Spalten-Gruppe pro Start; fehlende Umrundungen werden ergänzt
+        """
+        orbit_types = [detect_orbit_type(mission_type) for _, _, mission_type in launch_specs]
+        keys = [
+            (launch_id, tuple(coords), launch_time, orbit_type)
+            for launch_id, (coords, launch_time, _), orbit_type in zip(launch_ids, launch_specs, orbit_types)
+        ]
+        needed = count_orbits_in_range(
+            [orbit_period_for_type(orbit_type) for orbit_type in orbit_types],
+            total_orbits,
+            visibility_days
+        ).tolist()
+
+        with self._lock:
+            cached = [self._entries.get(key) for key in keys]
+
+        # Nur Starts berechnen, für die noch Umrundungen fehlen
+        missing = [
+            i for i, (entry, count) in enumerate(zip(cached, needed))
+            if entry is None or len(entry["orbit_number"]) < count
+        ]
+        if missing:
+            windows = compute_orbit_windows(
+                [launch_specs[i] for i in missing],
+                total_orbits=total_orbits,
+                visibility_days=visibility_days,
+                first_orbits=[len(cached[i]["orbit_number"]) + 1 if cached[i] else 1 for i in missing]
+            )
+            tails = _split_columns(orbit_window_columns(windows), len(missing))
+            for i, tail in zip(missing, tails):
+                if cached[i] is None:
+                    cached[i] = tail
+                else:
+                    cached[i] = {name: np.concatenate((cached[i][name], tail[name])) for name in orbit_columns}
+
+        with self._lock:
+            for key, entry in zip(keys, cached):
+                current = self._entries.get(key)
+                if current is None or len(current["orbit_number"]) < len(entry["orbit_number"]):
+                    self._entries[key] = entry
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return [{name: entry[name][:count] for name in orbit_columns} for entry, count in zip(cached, needed)]
+
+    def get_table(self, launch_specs, launch_ids, total_orbits=20, visibility_days=3):
+        """
+        Liefert die Orbit-Tabelle (eine Zeile pro Umrundung, Spalte "launch_id")
+        """
+        return orbit_table(
+            self._get_columns(launch_specs, launch_ids, total_orbits, visibility_days),
+            launch_ids
+        )